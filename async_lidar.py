@@ -0,0 +1,141 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from lidar import SCAN_PREFIX, Lidar
+from telegram import decode_telegram
+
+_executor = None
+
+def io_executor():
+    """
+    Thread pool shared by every AsyncLidar of the process for the blocking USB calls.
+
+    A worker is only taken for the duration of one transfer (at most the 100 ms
+    read timeout), so one pool serves any number of sensors on the same event loop.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) + 4),
+                                       thread_name_prefix="lidar-io")
+    return _executor
+
+class AsyncLidar:
+    """
+    asyncio front end of a Lidar.
+
+    Commands run on the shared I/O pool and are serialized per device, so several
+    sensors and the control logic can share one event loop. Scans are consumed
+    with `async for values, angles in lidar.scans()`; close the iterator (break out
+    of an `async with contextlib.aclosing(lidar.scans())` block, or aclose()) to
+    unsubscribe again.
+
+    Parameters:
+        lidar (Lidar): Connected driver, no longer used directly while wrapped.
+        executor (Executor or None): Where blocking calls run, io_executor() by default.
+    """
+
+    def __init__(self, lidar, executor=None):
+        self.lidar = lidar
+        self.executor = executor if executor is not None else io_executor()
+        self.received = 0
+        self.errors = 0
+        self._lock = asyncio.Lock()
+        self._inflight = None
+
+    @classmethod
+    async def open(cls, transport=None, executor=None):
+        """Find and connect the sensor without blocking the event loop."""
+        executor = executor if executor is not None else io_executor()
+        lidar = await asyncio.get_running_loop().run_in_executor(executor, Lidar, transport)
+        return cls(lidar, executor)
+
+    async def _call(self, func, *args):
+        async with self._lock:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def close(self):
+        await self._call(self.lidar.close)
+
+    async def firmware_version(self):
+        return await self._call(self.lidar.firmware_version)
+
+    async def device_identification(self):
+        return await self._call(self.lidar.device_identification)
+
+    async def set_access_mode(self, user="03", password="F4724744"):
+        return await self._call(self.lidar.set_access_mode, user, password)
+
+    async def set_measurement_range(self, start_angle, stop_angle):
+        return await self._call(self.lidar.set_measurement_range, start_angle, stop_angle)
+
+    async def set_scan_frequency(self, frequency):
+        return await self._call(self.lidar.set_scan_frequency, frequency)
+
+    async def start_measurement(self):
+        return await self._call(self.lidar.start_measurement)
+
+    async def run(self):
+        return await self._call(self.lidar.run)
+
+    async def scan_data(self, data):
+        return await self._call(self.lidar.scan_data, data)
+
+    async def scans(self, maxsize=8, decode=True):
+        """
+        Subscribe to the sensor and yield every scan in order.
+
+        A reader task keeps one transfer in flight and fills a queue of `maxsize`
+        telegrams; when the consumer falls behind the queue fills up and the reader
+        stops issuing transfers until there is room again, so scans wait on the
+        sensor instead of piling up in memory. The device is held for commands
+        until the iterator is closed.
+
+        Yields:
+            tuple: (values, angles) from decode_telegram, or the raw telegram
+            (bytes) when decode is False. Scans that fail to decode are counted in
+            `errors` and skipped.
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize)
+
+        async def read_loop():
+            while True:
+                self._inflight = loop.run_in_executor(self.executor, self.lidar.read_telegrams)
+                # Shielded: a cancelled transfer keeps running on its worker
+                for telegram in await asyncio.shield(self._inflight):
+                    if telegram.startswith(SCAN_PREFIX):
+                        self.received += 1
+                        await queue.put(telegram)
+
+        async with self._lock:
+            await loop.run_in_executor(self.executor, self.lidar.subscribe)
+            reader = loop.create_task(read_loop())
+            try:
+                while True:
+                    getter = loop.create_task(queue.get())
+                    await asyncio.wait((getter, reader), return_when=asyncio.FIRST_COMPLETED)
+                    if not getter.done():
+                        getter.cancel()
+                        reader.result()  # The reader died: raise its error here
+                    telegram = getter.result()
+                    if not decode:
+                        yield telegram
+                        continue
+                    try:
+                        scan = decode_telegram(telegram)
+                    except ValueError:
+                        self.errors += 1
+                        continue
+                    yield scan
+            finally:
+                reader.cancel()
+                try:
+                    await reader
+                except BaseException:
+                    pass  # Cancelled, or its error was already raised above: unsubscribe regardless
+                # The receive buffer is shared: let the last transfer finish first
+                if self._inflight is not None:
+                    await asyncio.wait((self._inflight,))
+                    self._inflight = None
+                await loop.run_in_executor(self.executor, self.lidar.unsubscribe)
@@ -0,0 +1,146 @@
+"""
+Run a processing chain over every frame of recorded datasets on all cores.
+
+Inputs are directories of saved frames (data/, data1/), single frames, or scan
+recordings written by recording.ScanRecorder. Frames are handed out to a process
+pool in chunks, results come back in input order and go to one JSON Lines file,
+one record per frame.
+
+    python batch.py data data1 -o results.jsonl --steps lines,obstacles
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+from convert_color import remove_white
+from coord_lib import segment_scan
+from line import detect_lines
+from line_extraction import scan_lines
+from recording import ScanRecording
+from render import scan_from_frame
+from sectors import SectorEngine
+
+STEPS = ('segments', 'lines', 'obstacles', 'hough')
+DEFAULT_STEPS = ('segments', 'lines', 'obstacles')
+
+# Per-process state, set up once by _init_worker
+_steps = DEFAULT_STEPS
+_scale = 0.1
+_engine = None
+_recordings = {}
+
+def frame_tasks(path):
+    """(source, index) of every frame under path; index is None for image files."""
+    if os.path.isdir(path):
+        names = sorted(os.listdir(path), key=lambda f: (len(f), f))  # 2.png before 10.png
+        tasks = []
+        for name in names:
+            if name.endswith('.png') or name.endswith('.rec'):
+                tasks.extend(frame_tasks(os.path.join(path, name)))
+        return tasks
+    if path.endswith('.png'):
+        return [(path, None)]
+    return [(path, i) for i in range(len(ScanRecording(path)))]
+
+def _init_worker(steps, scale, threshold):
+    global _steps, _scale, _engine
+    _steps = steps
+    _scale = scale
+    _engine = SectorEngine(threshold=threshold)
+
+def _recording(path):
+    recording = _recordings.get(path)
+    if recording is None:
+        recording = _recordings[path] = ScanRecording(path)
+    return recording
+
+def process_frame(task):
+    """Run the configured steps on one (source, index) task and return its record."""
+    source, index = task
+    record = {'source': source, 'index': index}
+    image = None
+    if index is None:
+        image = cv2.imread(source)
+        if image is None:
+            record['error'] = "unreadable image"
+            return record
+        values, angles = scan_from_frame(image, _scale)
+    else:
+        recording = _recording(source)
+        timestamp, values, angles = recording[index]
+        values = np.asarray(values, dtype=np.float64)
+        record['timestamp'] = float(timestamp)
+    record['beams'] = int(np.count_nonzero(values))
+
+    if 'segments' in _steps:
+        table = segment_scan(values)
+        record['segments'] = {'count': len(table), 'min_range': table.min_range().tolist()}
+    if 'lines' in _steps:
+        lines, _ = scan_lines(values, angles)
+        record['lines'] = {'endpoints': np.round(lines.endpoints, 1).tolist(),
+                           'residual': np.round(lines.residual, 2).tolist(),
+                           'points': lines.lengths.tolist()}
+    if 'obstacles' in _steps:
+        # 0 is no return, not a touching obstacle
+        min_distance, occupied = _engine.evaluate(np.where(values > 0, values, np.inf), angles)
+        record['obstacles'] = {'min_distance': [None if np.isinf(d) else float(d) for d in min_distance],
+                               'occupied': occupied.tolist()}
+    if 'hough' in _steps and image is not None:
+        gray = remove_white(cv2.cvtColor(image, cv2.COLOR_BGR2GRAY))
+        record['hough'] = [list(map(int, line)) for line in detect_lines(gray)]
+    return record
+
+def run(paths, output, steps=DEFAULT_STEPS, workers=None, chunksize=None, scale=0.1, threshold=100):
+    """
+    Process every frame under paths and write one JSON record per line to output.
+
+    Returns:
+        int: Number of frames processed.
+    """
+    tasks = [task for path in paths for task in frame_tasks(path)]
+    workers = workers or os.cpu_count() or 1
+    chunksize = chunksize or max(1, len(tasks) // (workers * 4))
+    initargs = (tuple(steps), scale, threshold)
+
+    with open(output, 'w') as out:
+        if workers == 1:
+            _init_worker(*initargs)
+            for record in map(process_frame, tasks):
+                out.write(json.dumps(record) + "\n")
+        else:
+            with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=initargs) as pool:
+                # map keeps input order while workers run ahead on later chunks
+                for record in pool.map(process_frame, tasks, chunksize=chunksize):
+                    out.write(json.dumps(record) + "\n")
+    return len(tasks)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('paths', nargs='+', help="frame directories, frames (.png) or recordings")
+    parser.add_argument('-o', '--output', default='results.jsonl')
+    parser.add_argument('--steps', default=','.join(DEFAULT_STEPS),
+                        help=f"comma separated, from {', '.join(STEPS)}")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument('--chunksize', type=int, default=None)
+    parser.add_argument('--scale', type=float, default=0.1, help="pixels per mm of saved frames")
+    parser.add_argument('--threshold', type=float, default=100, help="sector occupancy distance (mm)")
+    args = parser.parse_args(argv)
+
+    steps = [s for s in args.steps.split(',') if s]
+    unknown = set(steps) - set(STEPS)
+    if unknown:
+        parser.error(f"unknown steps: {', '.join(sorted(unknown))}")
+
+    start = time.perf_counter()
+    count = run(args.paths, args.output, steps, args.workers, args.chunksize, args.scale, args.threshold)
+    elapsed = time.perf_counter() - start
+    print(f"{count} frames in {elapsed:.1f} s ({count / elapsed:.0f} frames/s) -> {args.output}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,78 @@
+"""
+Time of the old combine_lines (sort, then scan every other segment and
+list.remove per merge) against the grid-indexed union-find merge in line.py,
+on synthetic Hough output: walls broken into short collinear fragments plus
+random clutter.
+
+Run from the repository root:
+    python -m benchmarks.bench_combine
+"""
+import time
+
+import numpy as np
+
+from line import combine_lines
+
+FRAGMENT_COUNTS = [50, 200, 800, 3200]
+
+def legacy_combine_lines(lines, max_distance=10):
+    if lines is None:
+        return []
+
+    combined_lines = []
+    lines = sorted(lines, key=lambda line: (line[0][0], line[0][1]))
+
+    while lines:
+        line = lines.pop(0)
+        x1, y1, x2, y2 = line[0]
+        combined = [x1, y1, x2, y2]
+        to_remove = []
+        for other_line in lines:
+            ox1, oy1, ox2, oy2 = other_line[0]
+            if (abs(ox1 - x2) < max_distance and abs(oy1 - y2) < max_distance) or \
+               (abs(ox2 - x1) < max_distance and abs(oy2 - y1) < max_distance):
+                combined = [min(x1, ox1), min(y1, oy1), max(x2, ox2), max(y2, oy2)]
+                to_remove.append(other_line)
+        for item in to_remove:
+            # Identity match: list.remove compares arrays element-wise and fails
+            lines.pop(next(k for k, l in enumerate(lines) if l is item))
+        combined_lines.append(combined)
+
+    return combined_lines
+
+def fragments(count, rng):
+    """(count, 1, 4) int32 segments: half wall fragments with small gaps, half clutter."""
+    walls = count // 2
+    per_wall = 10
+    segments = []
+    for w in range(max(walls // per_wall, 1)):
+        x0, y0 = rng.uniform(0, 640, 2)
+        theta = rng.uniform(0, np.pi)
+        ux, uy = np.cos(theta), np.sin(theta)
+        for k in range(per_wall):
+            t = k * 25.0
+            segments.append((x0 + t * ux, y0 + t * uy, x0 + (t + 20) * ux, y0 + (t + 20) * uy))
+    clutter = rng.uniform(0, 640, (count - len(segments), 2))
+    ends = clutter + rng.uniform(-30, 30, clutter.shape)
+    segments.extend(np.hstack((clutter, ends)))
+    return np.round(np.array(segments)).astype(np.int32).reshape(-1, 1, 4)
+
+def timed(func, lines, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(lines)
+        best = min(best, time.perf_counter() - start)
+    return best * 1e3, len(result)
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'fragments':>9} {'legacy ms':>10} {'lines':>6} {'indexed ms':>11} {'lines':>6}")
+    for count in FRAGMENT_COUNTS:
+        lines = fragments(count, rng)
+        legacy, legacy_n = timed(lambda l: legacy_combine_lines(list(l)), lines)
+        indexed, indexed_n = timed(combine_lines, lines)
+        print(f"{count:>9} {legacy:>10.2f} {legacy_n:>6} {indexed:>11.2f} {indexed_n:>6}")
+
+if __name__ == "__main__":
+    main()
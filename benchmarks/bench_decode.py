@@ -0,0 +1,39 @@
+"""
+Per-scan decode time of parse_telegram (str split + int() per beam) against
+decode_telegram (vectorized over the raw bytes), for CoLa-A text and for the
+binary CoLa-B telegram of the same scan, with the bytes each puts on the wire.
+
+Run from the repository root:
+    python -m benchmarks.bench_decode
+"""
+import timeit
+
+import numpy as np
+
+from telegram import decode_telegram, encode_binary_telegram, encode_telegram, frame_binary, parse_telegram
+
+BEAM_COUNTS = [271, 811, 10000]
+
+def bench(func, arg, number):
+    best = min(timeit.repeat(lambda: func(arg), number=number, repeat=5))
+    return best / number * 1e6  # us per scan
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'beams':>6} {'parse_telegram':>16} {'decode_telegram':>16} {'speedup':>8} {'CoLa-B':>12} "
+          f"{'bytes A':>8} {'bytes B':>8}")
+    for count in BEAM_COUNTS:
+        values = rng.integers(50, 4000, count)
+        text = encode_telegram(values, start_angle=0.0, angle_step=270.0 / (count - 1))
+        raw = b"\x02" + text.encode("ascii") + b"\x03"
+        binary = frame_binary(encode_binary_telegram(values, start_angle=0.0, angle_step=270.0 / (count - 1)))
+        number = max(10, 20000 // count)
+
+        legacy = bench(parse_telegram, text, number)
+        vectorized = bench(decode_telegram, raw, number)
+        cola_b = bench(decode_telegram, binary, number)
+        print(f"{count:>6} {legacy:>13.1f} us {vectorized:>13.1f} us {legacy / vectorized:>7.1f}x "
+              f"{cola_b:>9.1f} us {len(raw):>8} {len(binary):>8}")
+
+if __name__ == "__main__":
+    main()
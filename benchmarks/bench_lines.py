@@ -0,0 +1,65 @@
+"""
+Per-scan wall extraction time of the image path in line.py (render the scan,
+Canny + HoughLinesP + combine_lines, optionally from the PNG on disk) against
+scan_lines() working directly on the beam distances.
+
+The recordings in data/ and data1/ are rendered frames, so each one is turned
+back into a scan first with render.scan_from_frame. The PNG
+paths still see the white guide line drawn into every frame, and count it.
+
+Run from the repository root:
+    python -m benchmarks.bench_lines [folder] [frames]
+"""
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from line import detect_lines
+from line_extraction import scan_lines
+from render import ScanRenderer, scan_from_frame
+
+SCALE = 0.1  # Pixels per mm of the recorded frames
+
+def frame_paths(folder, count):
+    names = sorted((f for f in os.listdir(folder) if f.endswith('.png')), key=lambda f: int(f[:-4]))
+    return [os.path.join(folder, f) for f in names[:count]]
+
+def per_scan(func, items):
+    start = time.perf_counter()
+    results = [func(item) for item in items]
+    return (time.perf_counter() - start) / len(items) * 1e6, results
+
+def main(folder='data', count=200):
+    paths = frame_paths(folder, count)
+    scans = [scan_from_frame(cv2.imread(p), SCALE) for p in paths]
+    images = [cv2.imread(p, cv2.IMREAD_GRAYSCALE) for p in paths]
+    renderer = ScanRenderer(scale=SCALE)
+
+    def render_and_detect(scan):
+        values, angles = scan
+        x, y = renderer.project(values, angles)
+        renderer.clear()
+        renderer.draw_points(x, y, np.zeros(len(x), dtype=np.intp), values > 0,
+                             colors=np.array([(255, 255, 255)], dtype=np.uint8))
+        return detect_lines(cv2.cvtColor(renderer.frame, cv2.COLOR_BGR2GRAY))
+
+    png, png_lines = per_scan(lambda p: detect_lines(cv2.imread(p, cv2.IMREAD_GRAYSCALE)), paths)
+    hough, _ = per_scan(detect_lines, images)
+    rendered, _ = per_scan(render_and_detect, scans)
+    points, tables = per_scan(lambda scan: scan_lines(*scan)[0], scans)
+
+    print(f"{len(paths)} frames from {folder}/")
+    print(f"{'path':<34} {'us/scan':>10} {'segments/scan':>14}")
+    print(f"{'PNG read + Canny + Hough + merge':<34} {png:>10.0f} {np.mean([len(l) for l in png_lines]):>14.1f}")
+    print(f"{'Canny + Hough + merge':<34} {hough:>10.0f}")
+    print(f"{'render + Canny + Hough + merge':<34} {rendered:>10.0f}")
+    print(f"{'scan_lines (split-and-merge)':<34} {points:>10.0f} {np.mean([len(t) for t in tables]):>14.1f}")
+    residual = np.concatenate([t.residual for t in tables])
+    if len(residual):
+        print(f"segment RMS residual: median {np.median(residual):.1f} mm, max {residual.max():.1f} mm")
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else 'data', int(sys.argv[2]) if len(sys.argv) > 2 else 200)
@@ -0,0 +1,91 @@
+"""
+Per-read time and allocations of the old Lidar.read path (new 65535-byte
+transfer + "".join of chr() per byte + parse_telegram) against read_raw(), which
+fills the preallocated buffer and hands a memoryview to decode_telegram.
+
+Allocations are measured with tracemalloc over one read: the peak bytes
+allocated during the call (transient buffers and strings included) and the
+number of memory blocks the call leaves allocated while its result is held
+(per-beam Python ints and lists show up here). tracemalloc cannot count blocks
+that were allocated and freed again inside the call; those are only visible
+in the peak bytes.
+
+The USB transport is replaced by an in-memory stand-in, so this runs without
+the sensor.
+
+Run from the repository root:
+    python -m benchmarks.bench_read
+"""
+import array
+import time
+import tracemalloc
+
+import numpy as np
+
+from lidar import READ_SIZE, Lidar
+from telegram import decode_telegram, encode_telegram, parse_telegram
+
+READS = 2000
+
+class FakeTransport:
+    """Answers every read with the same framed telegram."""
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def open(self):
+        return True
+
+    def is_open(self):
+        return True
+
+    def write(self, data):
+        pass
+
+    def read(self, buffer, timeout):
+        memoryview(buffer)[:len(self.payload)] = self.payload
+        return len(self.payload)
+
+def legacy_read(lidar):
+    # pyusb allocates a fresh 65535-byte array when given a size instead of a buffer
+    arr = array.array('B', bytes(65535))
+    arr = arr[:lidar.transport.read(arr, timeout=100)]
+    arr = "".join([chr(x) for x in arr[1:-1]])
+    return parse_telegram(lidar.check_error(arr))
+
+def raw_read(lidar):
+    return decode_telegram(lidar.read_raw())
+
+def measure(func, lidar):
+    func(lidar)
+    start = time.perf_counter()
+    for _ in range(READS):
+        func(lidar)
+    elapsed = (time.perf_counter() - start) / READS
+
+    tracemalloc.start()
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    result = func(lidar)
+    _, peak = tracemalloc.get_traced_memory()
+    own = [tracemalloc.Filter(False, tracemalloc.__file__)]  # Not the snapshots themselves
+    held = tracemalloc.take_snapshot().filter_traces(own).compare_to(snapshot.filter_traces(own), 'lineno')
+    tracemalloc.stop()
+    del result
+    blocks = sum(stat.count_diff for stat in held if stat.count_diff > 0)
+    return elapsed * 1e6, peak - before, blocks
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"read buffer: {READ_SIZE} bytes, preallocated once per Lidar; {READS} reads per path")
+    print(f"{'beams':>6} {'path':>8} {'us/read':>9} {'peak bytes':>11} {'blocks':>7}")
+    for count in (271, 811):
+        text = encode_telegram(rng.integers(50, 4000, count), angle_step=270.0 / (count - 1))
+        lidar = Lidar(FakeTransport(b"\x02" + text.encode("ascii") + b"\x03"))
+        for name, func in (("legacy", legacy_read), ("raw", raw_read)):
+            us, peak, blocks = measure(func, lidar)
+            print(f"{count:>6} {name:>8} {us:>9.1f} {peak:>11} {blocks:>7}")
+
+if __name__ == "__main__":
+    main()
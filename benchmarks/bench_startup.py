@@ -0,0 +1,71 @@
+"""
+Cold-start cost of the headless core against the display scripts: wall time of
+a fresh interpreter running the imports, its peak RSS, and whether OpenCV or
+matplotlib got loaded.
+
+Every case runs in a new process, so nothing is shared with earlier runs but the
+OS file cache (the first, cold run is discarded as warm-up).
+
+Run from the repository root:
+    python -m benchmarks.bench_startup [runs] [--root path]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+CASES = {
+    'interpreter': "pass",
+    'import tim3xx': "import tim3xx",
+    'headless core': ("from tim3xx import Lidar, Pipeline, SectorEngine, TemporalFilter, Hysteresis, "
+                      "check_obstacles_in_sections, decode_telegram"),
+    'python -m tim3xx (imports)': "import tim3xx.__main__",
+    'import LaserUSB': "import LaserUSB",
+    'import Obstacle': "import Obstacle",
+    'numpy + cv2 + pyplot': "import numpy, cv2, matplotlib.pyplot",
+}
+
+PROBE = """
+import resource, sys
+{imports}
+heavy = [m for m in ('cv2', 'matplotlib', 'sklearn') if m in sys.modules]
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, ','.join(heavy))
+"""
+
+def run_case(imports, root):
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, '-c', PROBE.format(imports=imports)], cwd=root,
+                         capture_output=True, text=True, check=True,
+                         env=dict(os.environ, MPLBACKEND='Agg')).stdout.split()
+    elapsed = time.perf_counter() - start
+    return elapsed, int(out[0]) / 1024, out[1] if len(out) > 1 else ''
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('runs', nargs='?', type=int, default=5)
+    parser.add_argument('--root', default=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    parser.add_argument('--json', action='store_true', help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, imports in CASES.items():
+        try:
+            run_case(imports, args.root)  # Warm-up
+            runs = [run_case(imports, args.root) for _ in range(args.runs)]
+        except subprocess.CalledProcessError:
+            continue  # Module missing in this tree
+        times = sorted(r[0] for r in runs)
+        results[name] = {'median_ms': times[len(times) // 2] * 1e3, 'best_ms': times[0] * 1e3,
+                         'rss_mb': max(r[1] for r in runs), 'heavy': runs[0][2]}
+
+    if args.json:
+        print(json.dumps(results, indent=1))
+        return
+    print(f"{'case':>28} {'median':>10} {'best':>10} {'peak RSS':>10}  loaded")
+    for name, r in results.items():
+        print(f"{name:>28} {r['median_ms']:>7.0f} ms {r['best_ms']:>7.0f} ms {r['rss_mb']:>7.1f} MB  {r['heavy'] or '-'}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,56 @@
+"""
+Load test of the streaming pipeline (reader thread, framer, ring, decode) against
+the simulated TiM310 at multiples of the real 15 Hz scan rate.
+
+Run from the repository root:
+    python -m benchmarks.bench_stream [seconds]
+"""
+import sys
+import time
+
+from lidar import Lidar
+from simulator import SCAN_RATE, SimulatedTiM310
+from telegram import decode_telegram
+
+MULTIPLIERS = [1, 10, 100]
+
+def run(multiplier, seconds, fragment=1024, jitter=0.05):
+    device = SimulatedTiM310(scan_rate=SCAN_RATE * multiplier, jitter=jitter, fragment=fragment)
+    lidar = Lidar(device)
+    lidar.start_streaming(capacity=32)
+
+    decoded = 0
+    busy = 0.0
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        scan = lidar.next_scan(timeout=0.2)
+        if scan is None:
+            continue
+        _, telegram = scan
+        start = time.perf_counter()
+        decode_telegram(telegram)
+        busy += time.perf_counter() - start
+        decoded += 1
+
+    lidar.stop_streaming()
+    return {
+        "rate": decoded / seconds,
+        "sent": device.scans_sent,
+        "decoded": decoded,
+        "ring_dropped": lidar.ring.dropped,
+        "frames_dropped": lidar.framer.dropped,
+        "garbled": lidar.framer.garbled,
+        "decode_us": busy / decoded * 1e6 if decoded else 0.0,
+    }
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    print(f"{'rate':>6} {'scans/s':>8} {'sent':>6} {'decoded':>8} {'ring drop':>10} "
+          f"{'frame drop':>11} {'garbled':>8} {'decode us':>10}")
+    for multiplier in MULTIPLIERS:
+        r = run(multiplier, seconds)
+        print(f"{multiplier:>5}x {r['rate']:>8.1f} {r['sent']:>6} {r['decoded']:>8} {r['ring_dropped']:>10} "
+              f"{r['frames_dropped']:>11} {r['garbled']:>8} {r['decode_us']:>10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+Benchmark suite of the processing chain: every stage on its own and the whole
+per-scan frame, on synthetic E9 telegrams for real TiM3xx layouts and for much
+larger beam counts.
+
+Results are written as JSON and can be compared against a saved baseline; the
+run fails (exit status 1) when a stage got slower than the tolerance allows or
+a baseline stage was not measured.
+
+Run from the repository root:
+    python -m benchmarks.bench_suite -o baseline.json
+    python -m benchmarks.bench_suite --baseline baseline.json --tolerance 0.25
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from clustering import cluster_and_fit_line
+from coord_lib import ang2cartezian, ang_segmentation, rotate_points
+from line import combine_lines
+from render import ScanRenderer
+from sectors import check_obstacles_in_sections
+from telegram import decode_telegram, encode_telegram, parse_telegram
+
+# name: (beams, start angle, angle step), all covering 270 degrees from 0 like the simulator
+LAYOUTS = {
+    'tim310': (271, 0.0, 1.0),
+    'tim3xx_fine': (811, 0.0, 1 / 3),
+    'beams_10k': (10000, 0.0, 270 / 9999),
+    'beams_100k': (100000, 0.0, 270 / 99999),
+}
+DEFAULT_LAYOUTS = ('tim310', 'tim3xx_fine', 'beams_10k')
+ROTATION = -15  # Mounting rotation used by Obstacle.py and test.py
+
+def synthetic_scan(beams, start_angle, angle_step, seed=0):
+    """
+    Distances (mm) of a 4 m x 3 m room seen off-centre, with two boxes, range
+    noise and a few missing returns (0), as the sensor would report them.
+    """
+    rng = np.random.default_rng(seed)
+    angles = np.radians(start_angle + angle_step * np.arange(beams))
+    c, s = np.cos(angles), np.sin(angles)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        walls = np.stack((np.where(c > 0, 2500 / c, np.inf), np.where(c < 0, -1500 / c, np.inf),
+                          np.where(s > 0, 1800 / s, np.inf), np.where(s < 0, -1200 / s, np.inf)))
+    ranges = walls.min(axis=0)
+    for cx, cy, half in ((900, 400, 150), (-600, 900, 250)):
+        # Front face of a square box, where the beam hits it
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = (cy - half * np.sign(cy)) / s
+        hit = (t > 0) & (np.abs(t * c - cx) <= half)
+        ranges = np.where(hit, np.minimum(ranges, t), ranges)
+    ranges = np.clip(ranges + rng.normal(0, 8, beams), 50, 65000)
+    ranges[rng.random(beams) < 0.01] = 0
+    return ranges.astype(np.uint32)
+
+def hough_lines(values, angles):
+    """Raw HoughLinesP output on the rendered scan, the input combine_lines gets in line.py."""
+    renderer = ScanRenderer((640, 640), scale=0.1, radius=2)
+    x, y = renderer.project(values, angles)
+    inside = (0 <= x) & (x < 640) & (0 <= y) & (y < 640)
+    renderer.draw_points(x, y, np.zeros(len(x), dtype=np.intp), inside)
+    edges = cv2.Canny(cv2.cvtColor(renderer.frame, cv2.COLOR_BGR2GRAY), 50, 150)
+    lines = cv2.HoughLinesP(edges, 1, np.pi / 180, threshold=50, minLineLength=50, maxLineGap=10)
+    return np.zeros((0, 1, 4), dtype=np.int32) if lines is None else lines.reshape(-1, 1, 4)
+
+def frame(raw):
+    """What the detection thread does per scan: decode, rotate, sections, clusters, segments."""
+    values, angles = decode_telegram(raw)
+    values_rotated, angles_rotated = rotate_points(values, angles, ROTATION)
+    status = check_obstacles_in_sections(values, angles)
+    try:
+        line = cluster_and_fit_line(values_rotated, angles_rotated)
+    except ValueError:
+        line = None
+    return status, line, ang_segmentation(values)
+
+def stages(layout):
+    """Name and zero-argument callable of every benchmarked stage for a layout."""
+    beams, start_angle, angle_step = LAYOUTS[layout]
+    device_values = synthetic_scan(beams, start_angle, angle_step)
+    text = encode_telegram(device_values, start_angle, angle_step)
+    raw = b"\x02" + text.encode('ascii') + b"\x03"
+    values, angles = decode_telegram(raw)
+    values = values.astype(np.float64)
+    values_rotated, angles_rotated = rotate_points(values, angles, ROTATION)
+    lines = hough_lines(values, angles)
+    return {
+        'parse_telegram': lambda: parse_telegram(text),
+        'decode_telegram': lambda: decode_telegram(raw),
+        'ang2cartezian': lambda: ang2cartezian(angles, values),
+        'ang_segmentation': lambda: ang_segmentation(values),
+        'rotate_points': lambda: rotate_points(values, angles, ROTATION),
+        'check_obstacles_in_sections': lambda: check_obstacles_in_sections(values, angles),
+        'cluster_and_fit_line': lambda: cluster_and_fit_line(values_rotated, angles_rotated),
+        'combine_lines': lambda: combine_lines(lines),
+        'frame': lambda: frame(raw),
+    }
+
+def measure(func, repeat=7, min_time=0.02):
+    """Per-call seconds of each repeat, with calls per repeat calibrated to take min_time."""
+    func()  # Warm up caches (geometry tables, sector layouts)
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed == 0 else max(2, int(min_time / elapsed * 1.2))
+    times = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        times.append((time.perf_counter() - start) / number)
+    return times, number
+
+def run(layouts=DEFAULT_LAYOUTS, only=None, repeat=7, min_time=0.02, report=print):
+    results = []
+    for layout in layouts:
+        for stage, func in stages(layout).items():
+            if only and stage not in only:
+                continue
+            times, number = measure(func, repeat, min_time)
+            result = {'layout': layout, 'beams': LAYOUTS[layout][0], 'stage': stage,
+                      'best_us': min(times) * 1e6, 'median_us': statistics.median(times) * 1e6,
+                      'calls': number, 'repeat': repeat}
+            results.append(result)
+            report(f"{layout:>12} {stage:>28} {result['best_us']:>11.1f} us {result['median_us']:>11.1f} us")
+    return {
+        'machine': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'opencv': cv2.__version__,
+            'platform': platform.platform(),
+            'processor': platform.processor() or platform.machine(),
+            'cpus': os.cpu_count(),
+        },
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results,
+    }
+
+def compare(current, baseline, tolerance=0.25, layouts=None, only=None, report=print):
+    """
+    Compare best times per (layout, stage) with a baseline run.
+
+    Parameters:
+        layouts (iterable or None): Layouts the current run was asked for (default: all).
+        only (set or None): Stages the current run was asked for (default: all).
+
+    Returns:
+        list: (layout, stage, ratio) of every stage slower than 1 + tolerance times the
+        baseline, and (layout, stage, None) of every selected baseline stage the
+        current run lacks.
+    """
+    before = {(r['layout'], r['stage']): r for r in baseline['results']}
+    measured = {(r['layout'], r['stage']) for r in current['results']}
+    selected = {key for key in before
+                if (layouts is None or key[0] in layouts) and (not only or key[1] in only)}
+    regressions = []
+    report(f"{'layout':>12} {'stage':>28} {'baseline':>11} {'current':>11} {'ratio':>7}")
+    for r in current['results']:
+        old = before.get((r['layout'], r['stage']))
+        if old is None:
+            continue
+        ratio = r['best_us'] / old['best_us']
+        flag = " REGRESSION" if ratio > 1 + tolerance else ""
+        report(f"{r['layout']:>12} {r['stage']:>28} {old['best_us']:>8.1f} us {r['best_us']:>8.1f} us "
+               f"{ratio:>6.2f}x{flag}")
+        if flag:
+            regressions.append((r['layout'], r['stage'], ratio))
+    for layout, stage in before:
+        if (layout, stage) in selected and (layout, stage) not in measured:
+            report(f"{layout:>12} {stage:>28} {before[layout, stage]['best_us']:>8.1f} us {'-':>11} {'-':>7} MISSING")
+            regressions.append((layout, stage, None))
+    if baseline.get('machine') != current['machine']:
+        report("note: baseline was recorded on a different machine or software versions")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--layouts', default=','.join(DEFAULT_LAYOUTS),
+                        help=f"comma separated, from {', '.join(LAYOUTS)}")
+    parser.add_argument('--stages', default='', help="comma separated subset of stages (default: all)")
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--min-time', type=float, default=0.02, help="seconds per repeat")
+    parser.add_argument('-o', '--output', help="write the results as JSON")
+    parser.add_argument('--baseline', help="JSON results of an earlier run to compare with")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed slowdown, as a fraction")
+    args = parser.parse_args(argv)
+
+    layouts = [l for l in args.layouts.split(',') if l]
+    unknown = set(layouts) - set(LAYOUTS)
+    if unknown:
+        parser.error(f"unknown layouts: {', '.join(sorted(unknown))}")
+    only = {s for s in args.stages.split(',') if s}
+    unknown = only - set(stages('tim310'))  # Stage names are the same for every layout
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+
+    print(f"{'layout':>12} {'stage':>28} {'best':>14} {'median':>14}")
+    current = run(layouts, only, args.repeat, args.min_time)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=1)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print()
+        regressions = compare(current, baseline, args.tolerance, layouts, only)
+        if regressions:
+            missing = sum(ratio is None for _, _, ratio in regressions)
+            print(f"{len(regressions) - missing} stage(s) slower than {1 + args.tolerance:.2f}x the baseline, "
+                  f"{missing} missing from this run")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
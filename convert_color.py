@@ -1,17 +1,26 @@
 import cv2
 
-# Load the image in grayscale mode
-image_path = 'D:/Documents/Researches/2024_Project/SICK_TIM_3xx-master/1339.png'
-image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+def remove_white(image):
+    """Set the white (255) pixels of a grayscale frame, the drawn guide line, to black in place."""
+    # Create a mask where pixels are white (255)
+    mask = (image == 255)
 
-# Create a mask where pixels are white (255)
-mask = (image == 255)
+    # Set white pixels to black (0)
+    image[mask] = 0
+    return image
 
-# Set white pixels to black (0)
-image[mask] = 0
+def main():
+    # Load the image in grayscale mode
+    image_path = 'D:/Documents/Researches/2024_Project/SICK_TIM_3xx-master/1339.png'
+    image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
 
-# Save the modified image
-output_path = 'output_image.png'
-cv2.imwrite(output_path, image)
+    image = remove_white(image)
 
-print("Image processing complete. The output image has been saved.")
+    # Save the modified image
+    output_path = 'output_image.png'
+    cv2.imwrite(output_path, image)
+
+    print("Image processing complete. The output image has been saved.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from coord_lib import GEOMETRY
+from lidar import Lidar, find_transports
+from stream import ScanRing
+from telegram import decode_telegram
+
+# Sensor pose in the vehicle frame: offset in mm and rotation in degrees
+Mount = namedtuple('Mount', ['x', 'y', 'rotation'], defaults=(0.0, 0.0, 0.0))
+
+# One fusion cycle. x, y: all points in the vehicle frame (mm); sensor: index of the
+# sensor each point came from; stamps: receive time of every sensor's scan (nan when
+# it had none recent enough to take part)
+Cloud = namedtuple('Cloud', ['timestamp', 'x', 'y', 'sensor', 'stamps'])
+
+class SensorStats:
+    """Acquisition counters of one sensor and the age of its scans at fusion time."""
+
+    def __init__(self):
+        self.fused = 0
+        self.stale = 0
+        self.errors = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+
+    def add_latency(self, latency):
+        self.fused += 1
+        self.latency_sum += latency
+        self.latency_max = max(self.latency_max, latency)
+
+    @property
+    def latency_mean(self):
+        return self.latency_sum / self.fused if self.fused else 0.0
+
+class Sensor:
+    def __init__(self, name, lidar, mount=Mount()):
+        self.name = name
+        self.lidar = lidar
+        self.mount = mount
+        self.stats = SensorStats()
+
+class SensorManager:
+    """
+    Streams several sensors at once and fuses their scans into one point cloud per cycle.
+
+    Every sensor streams through its own Lidar ring with receive-time stamps. A
+    fusion thread runs one cycle per scan of the first (reference) sensor and takes
+    the newest scan of every other sensor received within `tolerance` seconds of it;
+    older scans are left out of that cycle and counted as stale. Each scan is
+    transformed by its sensor's Mount straight into its slice of the fused arrays,
+    so a cycle costs one pass over the points of every sensor.
+
+    Parameters:
+        sensors (list): Sensor objects; the first one paces the cycles.
+        tolerance (float): Largest receive-time difference to the reference scan (s).
+        capacity (int): Scans buffered per sensor.
+    """
+
+    def __init__(self, sensors, tolerance=1 / 15, capacity=8):
+        if not sensors:
+            raise ValueError("No sensors to manage")
+        self.sensors = sensors
+        self.tolerance = tolerance
+        self.capacity = capacity
+        self.clouds = ScanRing(1)
+        self.cycles = 0
+        self._last = [None] * len(sensors)
+        self._decoded = [None] * len(sensors)  # (scan, values, angles) of the last scan decoded per sensor
+        self._running = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def from_devices(cls, mounts=None, **kwargs):
+        """
+        Connect every attached sensor. `mounts` maps a bus path (see lidar.device_path)
+        to its Mount; sensors without an entry get the identity mount.
+        """
+        mounts = mounts or {}
+        sensors = [Sensor(t.path, Lidar(t), mounts.get(t.path, Mount())) for t in find_transports()]
+        return cls(sensors, **kwargs)
+
+    def start(self):
+        for sensor in self.sensors:
+            sensor.lidar.start_streaming(self.capacity)
+        self._running.set()
+        self._thread = threading.Thread(target=self._fuse_loop, name="lidar-fusion", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if not self._running.is_set():
+            return
+        self._running.clear()
+        self._thread.join()
+        for sensor in self.sensors:
+            sensor.lidar.stop_streaming()
+
+    def latest(self, timeout=None):
+        """Newest fused Cloud; clouds never looked at are dropped."""
+        return self.clouds.latest(timeout)
+
+    def _fuse_loop(self):
+        reference = self.sensors[0]
+        while self._running.is_set():
+            scan = reference.lidar.next_scan(timeout=0.1)
+            if scan is None:
+                continue
+            # A sensor without a new scan this cycle contributes its last one if still recent
+            for i, sensor in enumerate(self.sensors[1:], 1):
+                self._last[i] = sensor.lidar.latest_scan(timeout=0) or self._last[i]
+            scans = [scan] + self._last[1:]
+            cloud = self.fuse(scans)
+            self.cycles += 1
+            self.clouds.put(cloud)
+
+    def fuse(self, scans):
+        """
+        Cloud from one (receive time, telegram) per sensor, in sensor order. A sensor
+        without a scan (None) or with one older than `tolerance` is left out.
+
+        A scan passed again in a later cycle (the same tuple) is not decoded again:
+        its values and angles, or its decode error, are kept until the next scan.
+        """
+        now = time.monotonic()
+        reference_time = scans[0][0]
+        stamps = np.full(len(self.sensors), np.nan)
+        decoded = []
+        for i, (sensor, scan) in enumerate(zip(self.sensors, scans)):
+            if scan is None or abs(scan[0] - reference_time) > self.tolerance:
+                sensor.stats.stale += 1
+                continue
+            cached = self._decoded[i]
+            if cached is not None and cached[0] is scan:
+                _, values, angles = cached
+            else:
+                try:
+                    values, angles = decode_telegram(scan[1])
+                except ValueError:
+                    values = angles = None
+                    sensor.stats.errors += 1
+                self._decoded[i] = (scan, values, angles)
+            if values is None:
+                continue
+            stamps[i] = scan[0]
+            sensor.stats.add_latency(now - scan[0])
+            decoded.append((i, values, angles))
+
+        total = sum(len(values) for _, values, _ in decoded)
+        x = np.empty(total)
+        y = np.empty(total)
+        sensor_index = np.empty(total, dtype=np.intp)
+        start = 0
+        for i, values, angles in decoded:
+            end = start + len(values)
+            mount = self.sensors[i].mount
+            GEOMETRY.to_cartesian(values, angles, mount.rotation, out=(x[start:end], y[start:end]))
+            x[start:end] += mount.x
+            y[start:end] += mount.y
+            sensor_index[start:end] = i
+            start = end
+        return Cloud(reference_time, x, y, sensor_index, stamps)
+
+    def stats(self):
+        """Per-sensor latency (receive to fusion, seconds) and drop counts."""
+        result = {}
+        for sensor in self.sensors:
+            lidar, ring = sensor.lidar, sensor.lidar.ring
+            result[sensor.name] = {
+                'fused': sensor.stats.fused,
+                'stale': sensor.stats.stale,
+                'decode_errors': sensor.stats.errors,
+                'latency_mean': sensor.stats.latency_mean,
+                'latency_max': sensor.stats.latency_max,
+                'received': ring.received if ring is not None else 0,
+                'dropped': ring.dropped if ring is not None else 0,
+                'skipped': ring.skipped if ring is not None else 0,
+                'frames_dropped': lidar.framer.dropped,
+                'read_errors': lidar.read_errors,
+            }
+        return result
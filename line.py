@@ -1,56 +1,159 @@
-import cv2
 import numpy as np
 
-def combine_lines(lines, max_distance=10):
+def _close_endpoint_pairs(px, py, max_distance):
+    """
+    Pairs (i, j), i < j, of endpoints within max_distance of each other on both axes.
+
+    Endpoints are bucketed into a grid of max_distance cells, so only the 3 x 3
+    neighbourhood of every cell is compared and the cost grows with the number of
+    close pairs instead of the square of the number of endpoints.
+    """
+    cx = np.floor(px / max_distance).astype(np.int64)
+    cy = np.floor(py / max_distance).astype(np.int64)
+    cx -= cx.min() - 1
+    cy -= cy.min() - 1
+    width = cy.max() + 2
+    key = cx * width + cy
+    order = np.argsort(key, kind='stable')
+    sorted_key = key[order]
+
+    pairs_i, pairs_j = [], []
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            target = key + dx * width + dy
+            lo = np.searchsorted(sorted_key, target, side='left')
+            counts = np.searchsorted(sorted_key, target, side='right') - lo
+            i = np.repeat(np.arange(len(key)), counts)
+            offset = np.cumsum(counts) - counts
+            j = order[np.arange(len(i)) - np.repeat(offset - lo, counts)]
+            pairs_i.append(i)
+            pairs_j.append(j)
+    i = np.concatenate(pairs_i)
+    j = np.concatenate(pairs_j)
+    close = (i < j) & (np.abs(px[i] - px[j]) < max_distance) & (np.abs(py[i] - py[j]) < max_distance)
+    return i[close], j[close]
+
+def _find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]  # Path halving
+        i = parent[i]
+    return i
+
+def _first_per_group(hit, group):
+    """Position of the first True of every run of equal, ascending group labels."""
+    position = np.flatnonzero(hit)
+    return position[np.r_[True, group[position[1:]] != group[position[:-1]]]]
+
+def combine_lines(lines, max_distance=10, max_angle=10):
     """
     Combine closely aligned lines into a single continuous line.
+
+    Two segments are joined when any endpoint of one lies within max_distance
+    (on both axes) of an endpoint of the other and their directions differ by at
+    most max_angle degrees, so collinear fragments merge and crossing lines do
+    not. Joins are transitive: every chain of fragments becomes one line, spanning
+    the two outermost endpoints along the chain's mean direction.
+
+    Parameters:
+        lines (array-like or None): Segments as returned by cv2.HoughLinesP, (n, 1, 4) or (n, 4).
+        max_distance (float): Endpoint distance tolerance in pixels.
+        max_angle (float): Direction tolerance in degrees.
+
+    Returns:
+        list: [x1, y1, x2, y2] per combined line.
     """
-    if lines is None:
+    if lines is None or len(lines) == 0:
         return []
 
-    combined_lines = []
-    lines = sorted(lines, key=lambda line: (line[0][0], line[0][1]))  # Sort lines by their start point
-
-    while lines:
-        line = lines.pop(0)
-        x1, y1, x2, y2 = line[0]
-        combined = [x1, y1, x2, y2]
-        to_remove = []
-        for other_line in lines:
-            ox1, oy1, ox2, oy2 = other_line[0]
-            if (abs(ox1 - x2) < max_distance and abs(oy1 - y2) < max_distance) or \
-               (abs(ox2 - x1) < max_distance and abs(oy2 - y1) < max_distance):
-                combined = [min(x1, ox1), min(y1, oy1), max(x2, ox2), max(y2, oy2)]
-                to_remove.append(other_line)
-        for item in to_remove:
-            lines.remove(item)
-        combined_lines.append(combined)
-    
+    lines = np.asarray(lines).reshape(-1, 4)
+    lines = lines[np.lexsort((lines[:, 1], lines[:, 0]))]  # Sort lines by their start point
+    n = len(lines)
+    px = lines[:, [0, 2]].ravel().astype(np.float64)
+    py = lines[:, [1, 3]].ravel().astype(np.float64)
+
+    dx = (lines[:, 2] - lines[:, 0]).astype(np.float64)
+    dy = (lines[:, 3] - lines[:, 1]).astype(np.float64)
+    direction = np.degrees(np.arctan2(dy, dx)) % 180
+
+    i, j = _close_endpoint_pairs(px, py, max_distance)
+    a, b = i // 2, j // 2
+    turn = np.abs(direction[a] - direction[b])
+    aligned = (a != b) & (np.minimum(turn, 180 - turn) <= max_angle)
+
+    parent = list(range(n))
+    for a_, b_ in zip(a[aligned].tolist(), b[aligned].tolist()):
+        ra, rb = _find(parent, a_), _find(parent, b_)
+        if ra != rb:
+            parent[max(ra, rb)] = min(ra, rb)
+    group = np.array([_find(parent, k) for k in range(n)])
+
+    # Lines grouped by root: the root (lowest index) leads every run of the stable sort
+    order = np.argsort(group, kind='stable')
+    sizes = np.bincount(group, minlength=n)
+    roots = np.flatnonzero(sizes)
+    sizes = sizes[roots]
+    starts = np.cumsum(sizes) - sizes
+    member_group = np.repeat(np.arange(len(roots)), sizes)
+
+    # Length-weighted mean direction on doubled angles, so 1 and 179 degrees agree
+    length = np.hypot(dx, dy)[order]
+    doubled = np.radians(2 * direction[order])
+    theta = 0.5 * np.arctan2(np.add.reduceat(length * np.sin(doubled), starts),
+                             np.add.reduceat(length * np.cos(doubled), starts))
+
+    # Every endpoint of a group projected on its direction; per group all first
+    # endpoints come before all second ones, ties going to the earliest
+    ends = np.concatenate((2 * order, 2 * order + 1))
+    end_group = np.concatenate((member_group, member_group))
+    by_group = np.lexsort((np.repeat((0, 1), n), end_group))
+    ends, end_group = ends[by_group], end_group[by_group]
+    t = px[ends] * np.cos(theta)[end_group] + py[ends] * np.sin(theta)[end_group]
+    first = _first_per_group(t == np.minimum.reduceat(t, 2 * starts)[end_group], end_group)
+    last = _first_per_group(t == np.maximum.reduceat(t, 2 * starts)[end_group], end_group)
+
+    combined_lines = lines[roots].tolist()
+    merged = np.flatnonzero(sizes > 1)
+    spans = np.column_stack((px[ends[first]], py[ends[first]], px[ends[last]], py[ends[last]]))
+    for k, span in zip(merged.tolist(), spans[merged].astype(np.int64).tolist()):
+        combined_lines[k] = span
+
     return combined_lines
 
-# Load the image in grayscale mode
-image_path = 'D:/Documents/Researches/2024_Project/SICK_TIM_3xx-master/output_image.png'
-image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+def detect_lines(image, max_distance=10):
+    """Canny + probabilistic Hough on a rendered scan image, then combine_lines."""
+    import cv2  # combine_lines itself is NumPy only
+    # Apply Canny edge detector to find edges in the image
+    edges = cv2.Canny(image, 50, 150)
+
+    # Use Hough Line Transform to detect lines in the edge-detected image
+    lines = cv2.HoughLinesP(edges, 1, np.pi / 180, threshold=50, minLineLength=50, maxLineGap=10)
+    if lines is not None:
+        lines = lines.reshape(-1, 1, 4)  # Some OpenCV builds drop the middle axis
+
+    # Combine closely aligned lines into continuous lines
+    return combine_lines(lines, max_distance=max_distance)
 
-# Apply Canny edge detector to find edges in the image
-edges = cv2.Canny(image, 50, 150)
+def main():
+    import cv2
+    # Load the image in grayscale mode
+    image_path = 'D:/Documents/Researches/2024_Project/SICK_TIM_3xx-master/output_image.png'
+    image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
 
-# Use Hough Line Transform to detect lines in the edge-detected image
-lines = cv2.HoughLinesP(edges, 1, np.pi / 180, threshold=50, minLineLength=50, maxLineGap=10)
+    combined_lines = detect_lines(image, max_distance=10)
 
-# Combine closely aligned lines into continuous lines
-combined_lines = combine_lines(lines, max_distance=10)
+    # Convert grayscale image to color image to draw colored lines
+    color_image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
 
-# Convert grayscale image to color image to draw colored lines
-color_image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+    # Draw the combined lines on the image
+    for line in combined_lines:
+        x1, y1, x2, y2 = line
+        cv2.line(color_image, (x1, y1), (x2, y2), (0, 255, 0), 2)  # Draw green lines
 
-# Draw the combined lines on the image
-for line in combined_lines:
-    x1, y1, x2, y2 = line
-    cv2.line(color_image, (x1, y1), (x2, y2), (0, 255, 0), 2)  # Draw green lines
+    # Save the image with drawn lines
+    output_path = 'output_combined_lines.png'
+    cv2.imwrite(output_path, color_image)
 
-# Save the image with drawn lines
-output_path = 'output_combined_lines.png'
-cv2.imwrite(output_path, color_image)
+    print("Image processing complete. The output image with combined lines has been saved.")
 
-print("Image processing complete. The output image with combined lines has been saved.")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""Alias of tim3xx.line_extraction, for the scripts run from the repository root."""
+import sys
+
+import tim3xx.line_extraction
+
+sys.modules[__name__] = tim3xx.line_extraction
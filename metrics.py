@@ -0,0 +1,6 @@
+"""Alias of tim3xx.metrics, for the scripts run from the repository root."""
+import sys
+
+import tim3xx.metrics
+
+sys.modules[__name__] = tim3xx.metrics
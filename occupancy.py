@@ -0,0 +1,6 @@
+"""Alias of tim3xx.occupancy, for the scripts run from the repository root."""
+import sys
+
+import tim3xx.occupancy
+
+sys.modules[__name__] = tim3xx.occupancy
@@ -0,0 +1,156 @@
+import os
+import time
+
+import numpy as np
+
+MAGIC = b'TIMREC1'  # Stored null-padded to 8 bytes
+VERSION = 1
+
+# 64-byte file header followed by fixed-stride records
+HEADER_DTYPE = np.dtype([
+    ('magic', 'S8'),
+    ('version', '<u4'),
+    ('beams', '<u4'),
+    ('start_angle', '<f8'),
+    ('angle_step', '<f8'),
+    ('reserved', 'V32'),
+])
+
+def record_dtype(beams):
+    """One record: receive timestamp (seconds) and the distances of every beam (mm)."""
+    return np.dtype([('timestamp', '<f8'), ('values', '<u4', (beams,))])
+
+class ScanRecorder:
+    """
+    Append-only recorder of raw scans in a single binary file.
+
+    Every scan of a file shares one geometry, so records have a fixed stride and
+    scan i starts at HEADER_DTYPE.itemsize + i * stride; the timestamps double as
+    the index. The geometry is taken from the first scan when it is not given.
+    Appends go through a large write buffer, so a scan costs one memcpy on the
+    acquisition thread; call flush() or close() to push them to disk.
+
+    Parameters:
+        path (str): File to create, or to extend when it already holds a recording.
+        beams (int or None): Beams per scan.
+        start_angle (float or None): Angle of the first beam in degrees.
+        angle_step (float or None): Angular resolution in degrees.
+        buffering (int): Write buffer size in bytes.
+    """
+
+    def __init__(self, path, beams=None, start_angle=None, angle_step=None, buffering=1 << 20):
+        self.path = path
+        self.buffering = buffering
+        self.count = 0
+        self._file = None
+        self._record = None
+        if os.path.exists(path) and os.path.getsize(path) >= HEADER_DTYPE.itemsize:
+            header = read_header(path)
+            self._open(int(header['beams']), float(header['start_angle']), float(header['angle_step']))
+        elif beams is not None:
+            self._open(beams, start_angle or 0.0, angle_step or 0.0)
+
+    def _open(self, beams, start_angle, angle_step):
+        dtype = record_dtype(beams)
+        exists = os.path.exists(self.path) and os.path.getsize(self.path) >= HEADER_DTYPE.itemsize
+        if exists:
+            # Drop a partial trailing record left by an interrupted run
+            size = os.path.getsize(self.path)
+            self.count = (size - HEADER_DTYPE.itemsize) // dtype.itemsize
+            with open(self.path, 'r+b') as f:
+                f.truncate(HEADER_DTYPE.itemsize + self.count * dtype.itemsize)
+        self._file = open(self.path, 'ab', buffering=self.buffering)
+        if not exists:
+            header = np.zeros((), dtype=HEADER_DTYPE)
+            header['magic'] = MAGIC
+            header['version'] = VERSION
+            header['beams'] = beams
+            header['start_angle'] = start_angle
+            header['angle_step'] = angle_step
+            self._file.write(header.tobytes())
+        self.beams = beams
+        self.start_angle = start_angle
+        self.angle_step = angle_step
+        self._record = np.zeros((), dtype=dtype)
+
+    def append(self, values, angles=None, timestamp=None):
+        """Append one scan; angles are only used to set the geometry of a new file."""
+        if self._file is None:
+            if angles is None or len(angles) < 2:
+                raise ValueError("Scan geometry unknown: pass angles with the first scan")
+            self._open(len(values), float(angles[0]), float(angles[1] - angles[0]))
+        if len(values) != self.beams:
+            raise ValueError(f"Scan has {len(values)} beams, recording expects {self.beams}")
+        self._record['timestamp'] = time.time() if timestamp is None else timestamp
+        self._record['values'] = values
+        self._file.write(self._record.data)
+        self.count += 1
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def read_header(path):
+    header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+    if len(header) == 0 or header[0]['magic'] != MAGIC:
+        raise ValueError(f"{path} is not a scan recording")
+    if header[0]['version'] != VERSION:
+        raise ValueError(f"Unsupported recording version {header[0]['version']}")
+    return header[0]
+
+class ScanRecording:
+    """
+    Memory-mapped, read-only view of a recording written by ScanRecorder.
+
+    `timestamps` and `values` are zero-copy views into the mapped file, so any
+    range of scans can be sliced without reading the rest of the file. Scans
+    appended after opening are picked up by calling refresh().
+    """
+
+    def __init__(self, path):
+        self.path = path
+        header = read_header(path)
+        self.beams = int(header['beams'])
+        self.start_angle = float(header['start_angle'])
+        self.angle_step = float(header['angle_step'])
+        self.angles = self.start_angle + self.angle_step * np.arange(self.beams, dtype=np.float64)
+        self.refresh()
+
+    def refresh(self):
+        dtype = record_dtype(self.beams)
+        count = (os.path.getsize(self.path) - HEADER_DTYPE.itemsize) // dtype.itemsize
+        if count:
+            self.records = np.memmap(self.path, dtype=dtype, mode='r',
+                                     offset=HEADER_DTYPE.itemsize, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=dtype)
+        self.timestamps = self.records['timestamp']
+        self.values = self.records['values']
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, index):
+        """(timestamps, values, angles) of a scan or a slice of scans; timestamps and values are views."""
+        return self.timestamps[index], self.values[index], self.angles
+
+    def between(self, start, stop):
+        """Views of the scans with start <= timestamp < stop."""
+        i, j = np.searchsorted(self.timestamps, [start, stop])
+        return self[i:j]
+
+    def __iter__(self):
+        """(timestamp, values, angles) of every scan, in recording order, as indexing gives them."""
+        for i in range(len(self)):
+            yield self[i]
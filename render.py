@@ -0,0 +1,109 @@
+import numpy as np
+
+from coord_lib import GEOMETRY
+
+# BGR per 45 degree sector from 0 to 180 degrees, then the out-of-range color
+SECTOR_COLORS = np.array([
+    (0, 255, 0),     # 0 to 45: green
+    (0, 0, 255),     # 45 to 90: red
+    (42, 42, 165),   # 90 to 135: brown
+    (255, 0, 0),     # 135 to 180: blue
+    (0, 0, 0),       # Out of range
+], dtype=np.uint8)
+
+def point_colors(angles):
+    """Index into SECTOR_COLORS for every beam angle (degrees)."""
+    angles = np.asarray(angles)
+    index = np.floor_divide(angles, 45).astype(np.intp)
+    index[(angles < 0) | (angles >= 180)] = len(SECTOR_COLORS) - 1
+    return index
+
+def roi_occupancy(x, width, mask, sections=4):
+    """1 for every vertical image band of `width / sections` pixels holding a masked point."""
+    result = np.zeros(sections, dtype=int)
+    section_index = (x[mask] * sections) // width
+    result[section_index[(section_index >= 0) & (section_index < sections)]] = 1
+    return result.tolist()
+
+class ScanRenderer:
+    """
+    Draws a whole scan into a reused BGR frame in one bulk operation.
+
+    Points are projected to pixels all at once and stamped with the exact footprint
+    cv2.circle gives a filled circle of `radius`, so the image matches drawing the
+    points one by one.
+
+    Parameters:
+        shape (tuple): Frame height and width in pixels.
+        scale (float): Pixels per mm.
+        radius (int): Point radius in pixels.
+    """
+
+    def __init__(self, shape=(640, 640), scale=0.1, radius=2):
+        self.frame = np.zeros((shape[0], shape[1], 3), dtype=np.uint8)
+        self.scale = scale
+        self.center = (shape[1] // 2, shape[0] // 2)
+        self.radius = radius
+        self._dy = self._dx = None  # Stamp offsets, made on the first draw
+
+    def _make_stamp(self):
+        import cv2  # Only drawing needs OpenCV; projecting does not
+        radius = self.radius
+        stamp = np.zeros((2 * radius + 1, 2 * radius + 1), dtype=np.uint8)
+        cv2.circle(stamp, (radius, radius), radius, 1, -1)
+        dy, dx = np.nonzero(stamp)
+        self._dy = dy - radius
+        self._dx = dx - radius
+
+    def clear(self):
+        self.frame.fill(0)
+        return self.frame
+
+    def project(self, values, angles):
+        """Pixel columns and rows of every beam, truncated like int() on each point."""
+        x, y = GEOMETRY.to_cartesian(values, angles)
+        px = (self.center[0] + x * self.scale).astype(np.intp)
+        py = (self.center[1] - y * self.scale).astype(np.intp)
+        return px, py
+
+    def draw_points(self, x, y, color_index, mask=None, colors=SECTOR_COLORS):
+        if self._dy is None:
+            self._make_stamp()
+        if mask is not None:
+            x, y, color_index = x[mask], y[mask], color_index[mask]
+        rows = (y[:, None] + self._dy).ravel()
+        cols = (x[:, None] + self._dx).ravel()
+        color = np.repeat(colors[color_index], len(self._dy), axis=0)
+        height, width = self.frame.shape[:2]
+        visible = (rows >= 0) & (rows < height) & (cols >= 0) & (cols < width)
+        self.frame[rows[visible], cols[visible]] = color[visible]
+        return self.frame
+
+def scan_from_frame(image, scale=0.1, angle_step=1.0):
+    """
+    Recover a scan from a saved frame (BGR, rotated 90 degrees clockwise as the scripts
+    write them): the colored pixels are rotated back to the sensor frame, the white
+    guide line is ignored, and the closest pixel in every angle_step bin becomes that
+    beam's distance (mm, 0 where nothing was drawn).
+
+    Returns:
+        tuple: (values, angles) with beam angles in degrees over (-180, 180).
+    """
+    import cv2
+    # Non-black and not white; the channel reductions go through OpenCV, numpy's
+    # any/all over the channel axis is an order of magnitude slower
+    colored = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) > 0
+    colored &= cv2.inRange(image, (255, 255, 255), (255, 255, 255)) == 0
+    r, c = np.nonzero(colored)
+    # Undo the clockwise rotation: pixel (r, c) of the frame was (height - 1 - c, r)
+    height, width = colored.shape[1], colored.shape[0]
+    rows, cols = height - 1 - c, r
+    x = (cols - width // 2) / scale
+    y = (height // 2 - rows) / scale
+    beams = int(round(360 / angle_step))
+    angles = -180 + angle_step * (np.arange(beams) + 0.5)
+    beam = ((np.degrees(np.arctan2(y, x)) + 180) // angle_step).astype(np.intp) % beams
+    values = np.full(beams, np.inf)
+    np.minimum.at(values, beam, np.hypot(x, y))
+    values[np.isinf(values)] = 0
+    return values, angles
@@ -0,0 +1,6 @@
+"""Alias of tim3xx.sectors, for the scripts run from the repository root."""
+import sys
+
+import tim3xx.sectors
+
+sys.modules[__name__] = tim3xx.sectors
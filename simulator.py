@@ -0,0 +1,177 @@
+import struct
+import threading
+import time
+
+import numpy as np
+import usb.core
+
+from telegram import BINARY_ARGUMENTS, encode_binary_telegram, encode_telegram, frame_binary, unframe_binary
+
+SCAN_RATE = 15.0  # Scans per second of a real TiM310
+BEAMS = 271       # 270 degrees at 1 degree resolution
+
+class SimulatedTiM310:
+    """
+    In-memory TiM310 that plugs into Lidar as a transport.
+
+    Answers the CoLa-A commands the driver sends (FirmwareVersion, SetAccessMode,
+    Run, LMCstartmeas, sRI E9, sEN LMDscandata, mLMPsetscancfg) and, once
+    subscribed, pushes scan telegrams on the sensor's own clock. After
+    'sWN EIHstCola 1' it speaks CoLa-B: framed binary commands in, binary scans
+    and replies (small numeric arguments packed as bytes) out.
+
+    Parameters:
+        scan_rate (float): Scans per second; use multiples of SCAN_RATE for load tests.
+        beams (int): Beams per scan of the synthetic profile.
+        start_angle (float): Angle of the first beam in degrees.
+        angle_step (float): Angular resolution in degrees.
+        jitter (float): Random deviation of each scan period, as a fraction of it.
+        fragment (int or None): Largest transfer returned by read; transfers are cut
+            to a random size up to this, splitting telegrams across reads.
+        scans (list or None): Recorded distance arrays replayed in a loop instead of
+            the synthetic profile.
+        variants (int): Distinct synthetic scans pre-encoded and cycled through.
+        seed (int): Seed for the noise, jitter and fragmentation generator.
+    """
+
+    def __init__(self, scan_rate=SCAN_RATE, beams=BEAMS, start_angle=0.0, angle_step=1.0,
+                 jitter=0.0, fragment=None, scans=None, variants=16, seed=0):
+        self.scan_rate = scan_rate
+        self.jitter = jitter
+        self.fragment = fragment
+        self._rng = np.random.default_rng(seed)
+
+        if scans is None:
+            scans = [self._synthetic_profile(beams) for _ in range(variants)]
+        self._polled = [encode_telegram(s, start_angle, angle_step).encode('ascii') for s in scans]
+        self._pushed = [encode_telegram(s, start_angle, angle_step, streamed=True).encode('ascii')
+                        for s in scans]
+        self._polled_binary = [encode_binary_telegram(s, start_angle, angle_step) for s in scans]
+        self._pushed_binary = [encode_binary_telegram(s, start_angle, angle_step, streamed=True) for s in scans]
+        self.protocol = 'ascii'
+        self._switch_to = None
+        self._scan_index = 0
+
+        self._out = bytearray()
+        self._lock = threading.Lock()
+        self._open = False
+        self._subscribed = False
+        self._next_scan = 0.0
+        self.scans_sent = 0
+
+    def _synthetic_profile(self, beams):
+        # A rectangular room 4 m x 3 m seen from its middle, with range noise
+        angles = np.deg2rad(np.linspace(-45, 225, beams))
+        with np.errstate(divide='ignore'):
+            to_x = np.abs(2000 / np.cos(angles))
+            to_y = np.abs(1500 / np.sin(angles))
+        distances = np.minimum(to_x, to_y) + self._rng.normal(0, 10, beams)
+        return np.clip(distances, 50, 4000).astype(np.int64)
+
+    # Transport interface
+
+    def open(self):
+        self._open = True
+        return True
+
+    def is_open(self):
+        return self._open
+
+    def close(self):
+        self._open = False
+
+    def write(self, data):
+        if isinstance(data, str):
+            data = data.encode('latin-1')
+        with self._lock:
+            if self.protocol == 'binary':
+                cmd = self._binary_command(unframe_binary(data))
+            else:
+                cmd = data.strip(b'\0').strip(b'\x02\x03').decode('latin-1')
+            self._out += self._frame(self._reply(cmd))
+            if self._switch_to is not None:
+                # The reply goes out in the old protocol, everything after in the new one
+                self.protocol, self._switch_to = self._switch_to, None
+        return len(data)
+
+    def _binary_command(self, payload):
+        # Back to the ASCII form: name as text, packed arguments as hex tokens
+        parts = payload.split(b' ', 2)
+        name = b' '.join(parts[:2]).decode('ascii')
+        layout = BINARY_ARGUMENTS.get(name)
+        if len(parts) < 3 or layout is None:
+            return name
+        return ' '.join([name] + [f"{v:X}" for v in struct.unpack(layout, parts[2])])
+
+    def _frame(self, reply):
+        if self.protocol == 'ascii':
+            return b'\x02' + reply + b'\x03'
+        if not reply.startswith((b'sRA E9 ', b'sSN LMDscandata ')):
+            tokens = reply.split(b' ')
+            if len(tokens) > 2 and all(t.isdigit() for t in tokens[2:]):
+                reply = b' '.join(tokens[:2]) + b' ' + bytes(int(t) for t in tokens[2:])
+        return frame_binary(reply)
+
+    def read(self, buffer, timeout):
+        deadline = time.monotonic() + timeout / 1000.0
+        while True:
+            with self._lock:
+                self._push_due_scans(time.monotonic())
+                if self._out:
+                    return self._take(buffer)
+                wait = self._next_scan - time.monotonic() if self._subscribed else None
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise usb.core.USBTimeoutError("Operation timed out")
+            time.sleep(remaining if wait is None else max(0.0, min(wait, remaining)))
+
+    # Device behaviour
+
+    def _reply(self, cmd):
+        parts = cmd.split(' ')
+        name = ' '.join(parts[:2])
+        if name == 'sRN FirmwareVersion':
+            return b'sRA FirmwareVersion 5 V2.10'
+        if name == 'sRI 0':
+            return b'sRA 0 6 TiM310 5 V2.10'
+        if name == 'sMN SetAccessMode':
+            return b'sAN SetAccessMode 1'
+        if name == 'sMN Run':
+            return b'sAN Run 1'
+        if name == 'sMN LMCstartmeas':
+            return b'sAN LMCstartmeas 0'
+        if name == 'sMN mLMPsetscancfg':
+            return b'sAN mLMPsetscancfg 0'
+        if name == 'sRI E9':
+            return self._next_telegram(self._polled_binary if self.protocol == 'binary' else self._polled)
+        if name == 'sEN LMDscandata' and len(parts) > 2:
+            self._subscribed = parts[2] == '1'
+            self._next_scan = time.monotonic()
+            return f"sEA LMDscandata {parts[2]}".encode('ascii')
+        if name == 'sWN EIHstCola' and len(parts) > 2:
+            self._switch_to = 'binary' if parts[2] == '1' else 'ascii'
+            return b'sWA EIHstCola'
+        return b'sFA 2'  # Unknown command
+
+    def _next_telegram(self, telegrams):
+        telegram = telegrams[self._scan_index % len(telegrams)]
+        self._scan_index += 1
+        self.scans_sent += 1
+        return telegram
+
+    def _push_due_scans(self, now):
+        while self._subscribed and self._next_scan <= now:
+            scans = self._pushed_binary if self.protocol == 'binary' else self._pushed
+            self._out += self._frame(self._next_telegram(scans))
+            period = 1.0 / self.scan_rate
+            if self.jitter:
+                period *= 1.0 + self._rng.uniform(-self.jitter, self.jitter)
+            self._next_scan += period
+
+    def _take(self, buffer):
+        n = min(len(self._out), len(buffer))
+        if self.fragment:
+            n = min(n, int(self._rng.integers(1, self.fragment + 1)))
+        memoryview(buffer)[:n] = self._out[:n]
+        del self._out[:n]
+        return n
@@ -0,0 +1,6 @@
+"""Alias of tim3xx.stream, for the scripts run from the repository root."""
+import sys
+
+import tim3xx.stream
+
+sys.modules[__name__] = tim3xx.stream
@@ -0,0 +1,6 @@
+"""Alias of tim3xx.telegram, for the scripts run from the repository root."""
+import sys
+
+import tim3xx.telegram
+
+sys.modules[__name__] = tim3xx.telegram
@@ -0,0 +1,68 @@
+"""
+Headless core of the TiM3xx library: driver, telegram decoding, geometry and
+detection, depending on NumPy and pyusb only.
+
+Names are resolved on first access (PEP 562), so `import tim3xx` costs almost
+nothing and `from tim3xx import Lidar` loads the driver and what it needs.
+Visualization (render, line) and the display scripts are not part of the core;
+they load OpenCV and matplotlib themselves, on first use.
+
+The core modules live in this package (tim3xx.lidar, tim3xx.telegram, ...). The
+same-named files at the repository root only alias them for the scripts there.
+
+    from tim3xx import Lidar, Pipeline, check_obstacles_in_sections
+"""
+import importlib
+
+# Public name -> submodule defining it
+_EXPORTS = {
+    # Driver
+    'Lidar': 'lidar',
+    'LidarNotFound': 'lidar',
+    'UsbTransport': 'lidar',
+    'find_transports': 'lidar',
+    'ScanRing': 'stream',
+    'Pipeline': 'pipeline',
+    'Frame': 'pipeline',
+    'METRICS': 'metrics',
+    'Metrics': 'metrics',
+    # Decode
+    'decode_telegram': 'telegram',
+    'parse_telegram': 'telegram',
+    'encode_telegram': 'telegram',
+    'TelegramFramer': 'telegram',
+    'decode_binary_telegram': 'telegram',
+    'BinaryFramer': 'telegram',
+    # Geometry
+    'GEOMETRY': 'coord_lib',
+    'ang2cartezian': 'coord_lib',
+    'rotate_points': 'coord_lib',
+    'segment_scan': 'coord_lib',
+    'ang_segmentation': 'coord_lib',
+    # Detection
+    'SectorEngine': 'sectors',
+    'SECTIONS': 'sectors',
+    'check_obstacles_in_sections': 'sectors',
+    'TemporalFilter': 'temporal',
+    'Hysteresis': 'temporal',
+    'ZoneEngine': 'zones',
+    'Zone': 'zones',
+    'cluster_ordered': 'clustering',
+    'cluster_and_fit_line': 'clustering',
+    'scan_lines': 'line_extraction',
+    'Tracker': 'tracking',
+    'OccupancyGrid': 'occupancy',
+}
+
+__all__ = sorted(_EXPORTS)
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module('.' + module, __name__), name)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,58 @@
+"""
+Headless obstacle flags: stream scans and print the occupied sections of every
+scan, without loading any visualization backend.
+
+    python -m tim3xx [--threshold 100] [--offset -105] [--metrics 10]
+"""
+import argparse
+import sys
+import time
+
+from .lidar import Lidar, LidarNotFound
+from .metrics import METRICS
+from .pipeline import Pipeline
+from .sectors import SectorEngine, check_obstacles_in_sections
+from .temporal import Hysteresis, TemporalFilter
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threshold', type=float, default=100, help="switch-on distance (mm)")
+    parser.add_argument('--release', type=float, default=20, help="extra distance before switching off (mm)")
+    parser.add_argument('--offset', type=float, default=-105, help="mounting rotation (degrees)")
+    parser.add_argument('--window', type=int, default=3, help="scans in the per-beam median")
+    parser.add_argument('--metrics', type=float, default=0, help="log latencies every N seconds")
+    args = parser.parse_args(argv)
+
+    try:
+        lidar = Lidar()
+    except LidarNotFound as e:
+        print(e)
+        return 1
+    sections = SectorEngine(edges=(-90, -45, 0, 45, 90), threshold=args.threshold, offset=args.offset, wrap=0)
+    smoothing = TemporalFilter(window=args.window, mode='median')
+    hysteresis = Hysteresis(on=args.threshold, off=args.threshold + args.release)
+
+    def detect(values, angles):
+        obstacle_status = check_obstacles_in_sections(smoothing.update(values), angles, sections, hysteresis)
+        print(obstacle_status, flush=True)
+        return obstacle_status
+
+    print("Run:", lidar.run())
+    pipeline = Pipeline(lidar, detect)
+    if args.metrics:
+        METRICS.enable()
+        METRICS.report_every(args.metrics)
+    pipeline.start()
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        METRICS.stop_reporting()
+        pipeline.stop()
+        lidar.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
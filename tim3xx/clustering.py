@@ -0,0 +1,133 @@
+import numpy as np
+
+from .coord_lib import GEOMETRY
+
+class ClusterTable:
+    """
+    Clusters of an angle-ordered scan with a total least squares line per cluster.
+
+    Cluster i covers points starts[i] to starts[i] + lengths[i] - 1 of the scan;
+    clusters may leave points out and neighbouring ones may share a point.
+    All statistics are arrays with one entry per cluster:
+        centroid_x, centroid_y: Mean point.
+        angle: Direction of the fitted line in degrees, in (-90, 90].
+        residual: RMS perpendicular distance of the points to the line.
+        endpoints: (n, 4) array of x1, y1, x2, y2, the first and last point
+            projected onto the line.
+    """
+
+    def __init__(self, x, y, starts, lengths):
+        self.x = x
+        self.y = y
+        self.starts = starts
+        self.lengths = lengths
+        self._fit()
+
+    def __len__(self):
+        return len(self.starts)
+
+    def _fit(self):
+        if len(self) == 0:
+            empty = np.zeros(0)
+            self.centroid_x = self.centroid_y = self.angle = self.residual = empty
+            self.endpoints = np.zeros((0, 4))
+            return
+
+        # Gather the points of every cluster back to back (clusters may skip points
+        # or share a corner point), then one reduceat per moment over the groups
+        n = self.lengths
+        group = np.concatenate(([0], np.cumsum(n)[:-1]))
+        index = np.arange(n.sum()) + np.repeat(self.starts - group, n)
+        x, y = self.x[index], self.y[index]
+        mx = np.add.reduceat(x, group) / n
+        my = np.add.reduceat(y, group) / n
+        dx = x - np.repeat(mx, n)
+        dy = y - np.repeat(my, n)
+        cxx = np.add.reduceat(dx * dx, group) / n
+        cyy = np.add.reduceat(dy * dy, group) / n
+        cxy = np.add.reduceat(dx * dy, group) / n
+
+        # Major axis of the covariance is the total least squares direction, so
+        # vertical walls fit as well as horizontal ones
+        theta = 0.5 * np.arctan2(2 * cxy, cxx - cyy)
+        spread = np.sqrt(((cxx - cyy) / 2) ** 2 + cxy ** 2)
+        minor = np.maximum((cxx + cyy) / 2 - spread, 0.0)
+
+        self.centroid_x = mx
+        self.centroid_y = my
+        angle = np.rad2deg(theta)
+        self.angle = np.where(angle <= -90, angle + 180, angle)
+        self.residual = np.sqrt(minor)
+
+        ux, uy = np.cos(theta), np.sin(theta)
+        first = self.starts
+        last = self.starts + n - 1
+        t1 = (self.x[first] - mx) * ux + (self.y[first] - my) * uy
+        t2 = (self.x[last] - mx) * ux + (self.y[last] - my) * uy
+        self.endpoints = np.column_stack((mx + t1 * ux, my + t1 * uy, mx + t2 * ux, my + t2 * uy))
+
+    def largest(self):
+        """Index of the cluster with the most points."""
+        if len(self) == 0:
+            raise ValueError("No clusters")
+        return int(np.argmax(self.lengths))
+
+    def points(self, i):
+        """(n, 2) array of the points of cluster i, copied out of the x and y arrays."""
+        s = slice(self.starts[i], self.starts[i] + self.lengths[i])
+        return np.column_stack((self.x[s], self.y[s]))
+
+def cluster_runs(x, y, ranges=None, max_gap=10.0, range_ratio=0.0, min_points=5):
+    """(starts, lengths) of the clusters cluster_ordered finds, without the line fits."""
+    if len(x) == 0:
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+
+    limit = max_gap
+    if range_ratio:
+        r = np.asarray(ranges, dtype=np.float64)
+        limit = max_gap + range_ratio * np.minimum(r[:-1], r[1:])
+    breaks = np.flatnonzero(np.hypot(np.diff(x), np.diff(y)) > limit) + 1
+    starts = np.concatenate(([0], breaks))
+    lengths = np.diff(np.append(starts, len(x)))
+
+    keep = lengths >= min_points
+    return starts[keep], lengths[keep]
+
+def cluster_ordered(x, y, ranges=None, max_gap=10.0, range_ratio=0.0, min_points=5):
+    """
+    Cluster the points of an angle-ordered scan in one linear pass.
+
+    Neighbouring beams belong to the same cluster when the Euclidean gap between
+    them is at most max_gap + range_ratio * range, so the tolerance can grow with
+    the beam spacing at distance. Runs shorter than min_points are left out.
+
+    Parameters:
+        x, y (array-like): Cartesian points in scan order.
+        ranges (array-like or None): Range of every point, needed when range_ratio > 0.
+        max_gap (float): Fixed part of the gap tolerance.
+        range_ratio (float): Range-proportional part of the gap tolerance.
+        min_points (int): Smallest cluster kept.
+
+    Returns:
+        ClusterTable: Every kept cluster with its line fit.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    starts, lengths = cluster_runs(x, y, ranges, max_gap, range_ratio, min_points)
+    return ClusterTable(x, y, starts, lengths)
+
+def cluster_and_fit_line(values, angles):
+    # Convert polar to cartesian coordinates
+    x_coords, y_coords = GEOMETRY.to_cartesian(values, angles)
+    
+    # Cluster neighbouring beams in scan order; the gap tolerance grows with range
+    clusters = cluster_ordered(x_coords, y_coords, values, max_gap=10, range_ratio=0.05, min_points=5)
+    if len(clusters) == 0:
+        raise ValueError("Not enough points to fit a line")
+
+    # Total least squares line of the largest cluster, angle relative to the x-axis
+    largest_cluster = clusters.largest()
+    cluster_coords = clusters.points(largest_cluster)
+    angle = clusters.angle[largest_cluster]
+    
+    return cluster_coords, angle
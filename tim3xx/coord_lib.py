@@ -0,0 +1,192 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+
+def geometry_key(angles):
+    """Identify a scan layout by its full angle vector (beam count and float64 bytes)."""
+    angles = np.ascontiguousarray(angles, dtype=np.float64)
+    return (len(angles), angles.tobytes())
+
+class TrigTable:
+    """cos/sin of one scan layout with the mounting rotation folded in, read-only since it is shared."""
+
+    def __init__(self, angles, rotation):
+        radians = np.deg2rad(np.asarray(angles, dtype=np.float64) + rotation)
+        self.cos = np.cos(radians)
+        self.sin = np.sin(radians)
+        # Rotated beam angles in (-180, 180], as np.arctan2 reports them
+        self.angles = np.rad2deg(np.arctan2(self.sin, self.cos))
+        for array in (self.cos, self.sin, self.angles):
+            array.setflags(write=False)
+
+class GeometryCache:
+    """
+    Precomputed trigonometry per scan layout and mounting rotation.
+
+    The angle vector of a scan only changes when the measurement range does, so
+    cos/sin are computed once per (layout, rotation) and a scan converts to x/y
+    with two multiplies. Least recently used layouts are evicted beyond
+    `max_entries`; invalidate() drops everything, e.g. after set_measurement_range.
+    Lookups are locked, as the detection, fusion and display threads share it.
+    """
+
+    def __init__(self, max_entries=8):
+        self.max_entries = max_entries
+        self._tables = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._tables)
+
+    def table(self, angles, rotation=0.0):
+        key = geometry_key(angles) + (float(rotation),)
+        with self._lock:
+            table = self._tables.get(key)
+            if table is not None:
+                self._tables.move_to_end(key)
+                return table
+        table = TrigTable(angles, rotation)  # Built unlocked; a racing thread's copy is identical
+        with self._lock:
+            table = self._tables.setdefault(key, table)
+            self._tables.move_to_end(key)
+            if len(self._tables) > self.max_entries:
+                self._tables.popitem(last=False)
+        return table
+
+    def invalidate(self):
+        with self._lock:
+            self._tables.clear()
+
+    def to_cartesian(self, values, angles, rotation=0.0, out=None):
+        """
+        Convert distances to x/y in the frame rotated by `rotation` degrees.
+
+        Without `out` new arrays are returned; pass `out=(x, y)` to fill
+        preallocated buffers in place.
+        """
+        table = self.table(angles, rotation)
+        if out is None:
+            return np.multiply(values, table.cos), np.multiply(values, table.sin)
+        x, y = out
+        np.multiply(values, table.cos, out=x)
+        np.multiply(values, table.sin, out=y)
+        return x, y
+
+# Shared by every caller in the process; Lidar.set_measurement_range invalidates it
+GEOMETRY = GeometryCache()
+
+def ang2cartezian(axis, distance):
+    """
+    Convert angular coordinates and distances to Cartesian coordinates.
+    
+    Parameters:
+        axis (array-like): Angular coordinates in degrees.
+        distance (array-like): Distances corresponding to the angles.
+    
+    Returns:
+        tuple: (x, y) where x and y are arrays of Cartesian coordinates.
+    """
+    axis = np.asarray(axis, dtype=float)
+    distance = np.asarray(distance, dtype=float)
+    
+    if len(axis) != len(distance):
+        raise ValueError(f"Error: Inputs have different lengths: axis length = {len(axis)}, distance length = {len(distance)}")
+    
+    x = np.empty(len(distance), dtype=np.float64)
+    y = np.empty(len(distance), dtype=np.float64)
+    return GEOMETRY.to_cartesian(distance, axis, out=(x, y))
+
+class SegmentTable:
+    """
+    Segments of a scan as parallel start/length arrays over the original data.
+
+    Segment data is only materialised as views into `scan` on access, and the
+    per-segment statistics are computed for all segments at once with reduceat.
+    """
+
+    def __init__(self, scan, starts, lengths):
+        self.scan = scan
+        self.starts = starts
+        self.lengths = lengths
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, i):
+        """Zero-copy view of segment i."""
+        start = self.starts[i]
+        return self.scan[start:start + self.lengths[i]]
+
+    def views(self):
+        return [self[i] for i in range(len(self))]
+
+    def min_range(self):
+        """Closest return of every segment."""
+        if len(self) == 0:
+            return np.zeros(0)
+        return np.minimum.reduceat(self.scan, self.starts)
+
+    def centroids(self, angles):
+        """(x, y) centre of every segment for the given beam angles in degrees."""
+        if len(self) == 0:
+            return np.zeros(0), np.zeros(0)
+        x, y = GEOMETRY.to_cartesian(self.scan, angles)
+        return np.add.reduceat(x, self.starts) / self.lengths, np.add.reduceat(y, self.starts) / self.lengths
+
+    def extents(self, angles):
+        """Distance between the first and last point of every segment."""
+        if len(self) == 0:
+            return np.zeros(0)
+        x, y = GEOMETRY.to_cartesian(self.scan, angles)
+        last = self.starts + self.lengths - 1
+        return np.hypot(x[last] - x[self.starts], y[last] - y[self.starts])
+
+def segment_scan(scan, max_diff=150):
+    """
+    Split a scan wherever adjacent ranges differ by more than max_diff.
+
+    Parameters:
+        scan (array-like): Array of scan data.
+        max_diff (int): Maximum allowed difference between adjacent points to be considered part of the same segment.
+
+    Returns:
+        SegmentTable: Every segment, single points included, in scan order. Segments
+        are views into `scan` itself when it is already a numeric array.
+    """
+    scan = np.asarray(scan)
+    if scan.dtype.kind not in 'iuf':
+        scan = scan.astype(np.float64)
+    if len(scan) == 0:
+        return SegmentTable(scan, np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp))
+    # Differences in float, so unsigned ranges (decoded uint32) cannot wrap around
+    breaks = np.flatnonzero(np.abs(np.diff(scan.astype(np.float64, copy=False))) > max_diff) + 1
+    starts = np.concatenate(([0], breaks))
+    lengths = np.diff(np.append(starts, len(scan)))
+    return SegmentTable(scan, starts, lengths)
+
+def ang_segmentation(scan, max_diff=150):
+    """
+    Segment the angular scan data based on a maximum difference threshold.
+    
+    Single-point segments are dropped, except for the last segment of the scan.
+
+    Parameters:
+        scan (array-like): Array of scan data.
+        max_diff (int): Maximum allowed difference between adjacent points to be considered part of the same segment.
+    
+    Returns:
+        list: A list of segments, where each segment is represented as [start_id, len_of_segment, segment_data].
+    """
+    table = segment_scan(scan, max_diff)
+    if len(table) == 0:
+        return [[0, 0, table.scan]]
+    keep = table.lengths > 1
+    keep[-1] = True
+    return [[int(table.starts[i]), int(table.lengths[i]), table[i]] for i in np.flatnonzero(keep)]
+
+def rotate_points(values, angles, rotation_angle_deg):
+    # Rotating keeps every range; the rotated angles are the cached trig table's, read-only
+    values_rotated = np.asarray(values, dtype=np.float64)
+    angles_rotated = GEOMETRY.table(angles, rotation_angle_deg).angles
+
+    return values_rotated, angles_rotated
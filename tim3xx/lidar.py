@@ -0,0 +1,329 @@
+import array
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import usb.core
+import usb.util
+
+from .coord_lib import GEOMETRY
+from .metrics import METRICS
+from .stream import ScanRing
+from .telegram import BinaryFramer, TelegramFramer, encode_binary_command, frame_binary
+
+READ_SIZE = 65535  # Largest transfer requested from the IN endpoint
+SCAN_PREFIX = b"sSN LMDscandata"  # Scans pushed while subscribed
+PROTOCOLS = ('ascii', 'binary')  # CoLa-A and CoLa-B
+
+class LidarNotFound(Exception):
+    pass
+
+def device_path(device):
+    """Bus and port chain of a USB device, e.g. "1-2.3"; stable while the cabling is."""
+    ports = getattr(device, 'port_numbers', None) or ()
+    return f"{device.bus}-{'.'.join(map(str, ports))}"
+
+def device_serial(device):
+    """Serial number string of a USB device, or None when it cannot be read."""
+    try:
+        return usb.util.get_string(device, device.iSerialNumber) if device.iSerialNumber else None
+    except (usb.core.USBError, ValueError, NotImplementedError):
+        return None
+
+class UsbTransport:
+    """
+    Bulk endpoints of a TiM3xx on USB through pyusb.
+
+    Any object with the same open/is_open/write/read/close methods can be passed to
+    Lidar as its transport; read fills the given array and returns the byte count,
+    and errors are reported as usb.core.USBError (USBTimeoutError on timeout).
+    With several sensors attached, `path` (see device_path) or `serial` selects one;
+    otherwise the first matching device is used.
+    """
+
+    def __init__(self, id_vendor=0x19a2, id_product=0x5001, path=None, serial=None):
+        self.id_vendor = id_vendor
+        self.id_product = id_product
+        self.path = path
+        self.serial = serial
+        self.device = None
+
+    def open(self):
+        for device in usb.core.find(find_all=True, idVendor=self.id_vendor, idProduct=self.id_product):
+            if self.path is not None and device_path(device) != self.path:
+                continue
+            if self.serial is not None and device_serial(device) != self.serial:
+                continue
+            self.device = device
+            self.device.set_configuration()
+            return True
+        return False
+
+    def is_open(self):
+        return self.device is not None
+
+    def write(self, data):
+        self.device.write(2 | usb.ENDPOINT_OUT, data, 0)  # Endpoint OUT
+
+    def read(self, buffer, timeout):
+        return self.device.read(1 | usb.ENDPOINT_IN, buffer, timeout=timeout)  # Endpoint IN
+
+    def close(self):
+        if self.device is not None:
+            usb.util.dispose_resources(self.device)
+            self.device = None
+
+def find_transports(id_vendor=0x19a2, id_product=0x5001):
+    """One UsbTransport per attached sensor, pinned to its bus path."""
+    devices = usb.core.find(find_all=True, idVendor=id_vendor, idProduct=id_product)
+    return [UsbTransport(id_vendor, id_product, path=device_path(d)) for d in devices]
+
+class Lidar:
+    def __init__(self, transport=None, protocol='ascii'):
+        if protocol not in PROTOCOLS:
+            raise ValueError(f"Unknown protocol {protocol!r}, expected one of {', '.join(PROTOCOLS)}")
+        self.transport = transport if transport is not None else UsbTransport()
+        self.protocol = protocol  # What the sensor currently speaks, see set_protocol
+        # Receive buffer reused by every read_raw() call
+        self._buffer = array.array('B', bytes(READ_SIZE))
+        self._view = memoryview(self._buffer)
+        self._bytes = np.frombuffer(self._buffer, dtype=np.uint8)
+        self.framer = TelegramFramer(READ_SIZE) if protocol == 'ascii' else BinaryFramer()
+        self._frames = deque()  # Telegrams framed from a transfer but not yet returned
+        self.ring = None
+        self.read_errors = 0
+        self.last_receive = None
+        self.metrics = METRICS  # Stage timings: usb_write, usb_read, framing, to_text
+        self._reader = None
+        self._streaming = threading.Event()
+        self.connect()
+
+    def connect(self):
+        if not self.transport.open():
+            raise LidarNotFound("LiDAR Device is not connected!")
+
+    def connected(self):
+        return self.transport.is_open()
+
+    def close(self):
+        self.stop_streaming()
+        self.transport.close()
+
+    def set_measurement_range(self, start_angle, stop_angle):
+        # Convert angles to hex format required by your LiDAR
+        start_angle_hex = f"{int(start_angle * 10000):08X}"
+        stop_angle_hex = f"{int(stop_angle * 10000):08X}"
+        self.send(f"sMN mLMPsetscancfg +2500 +5000 {start_angle_hex} {stop_angle_hex}")
+        GEOMETRY.invalidate()  # Beam angles change with the range
+        return self.read()
+
+    def set_scan_frequency(self, frequency):
+        # Assuming frequency is in Hz and needs to be converted to an appropriate format
+        frequency_hex = f"{int(frequency * 100):04X}"
+        self.send(f"sMN mLMPsetscancfg {frequency_hex}")
+        return self.read()
+    
+    def send(self, cmd):
+        if self.connected():
+            try:
+                #print(f"Sending command: {cmd}")
+                start = self.metrics.clock()
+                if self.protocol == 'binary':
+                    self.transport.write(frame_binary(encode_binary_command(cmd)))
+                else:
+                    self.transport.write(f"\x02{cmd}\x03\0")
+                self.metrics.record('usb_write', start)
+            except usb.core.USBError as e:
+                print(f"Error sending command to LiDAR: {e}")
+        else:
+            print("LiDAR Device not found!")
+
+    def read(self):
+        arr = self.read_raw()
+        if arr is None:
+            return None
+        start = self.metrics.clock()
+        arr = arr.tobytes().decode('latin-1')
+        arr = self.check_error(arr)
+        self.metrics.record('to_text', start)
+        return arr
+
+    def read_raw(self):
+        """
+        Read the next telegram through the preallocated receive buffer.
+
+        A transfer holding exactly one telegram is returned without copying; split
+        or coalesced transfers go through the framer.
+
+        Returns:
+            memoryview: The telegram without STX/ETX, or None on a USB error. The view
+            may point into the shared buffer and is only valid until the next read.
+        """
+        if self.connected():
+            try:
+                return self._next_telegram()
+            except usb.core.USBError as e:
+                self.metrics.count('timeouts' if isinstance(e, usb.core.USBTimeoutError) else 'read_errors')
+                print(f"Error reading from LiDAR: {e}")
+                return None
+        else:
+            raise LidarNotFound("LiDAR Device is not connected!")
+
+    def _transfer(self):
+        start = self.metrics.clock()
+        n = self.transport.read(self._buffer, timeout=100)
+        self.metrics.record('usb_read', start)
+        return n
+
+    def _next_telegram(self):
+        if self._frames:
+            return memoryview(self._frames.popleft())
+        while True:
+            n = self._transfer()
+            # Control bytes (\0, STX, ETX) only occur as framing in CoLa-A
+            if (self.protocol == 'ascii' and self.framer.idle() and n >= 2 and self._buffer[0] == 0x02
+                    and self._buffer[n - 1] == 0x03 and not (self._bytes[1:n - 1] < 4).any()):
+                self.framer.count_frame()
+                return self._view[1:n - 1]
+            self._frames.extend(self.framer.feed(self._view[:n]))
+            if self._frames:
+                return memoryview(self._frames.popleft())
+
+    def check_error(self, response):
+        if "FA" in response:
+            #print("Error response received:", response)
+            pass
+        return response
+
+    def firmware_version(self):
+        self.send("sRN FirmwareVersion")
+        return self.read()
+
+    def device_identification(self):
+        self.send("sRI 0")
+        return self.read()
+
+    def set_access_mode(self, user="03", password="F4724744"):
+        self.send(f'sMN SetAccessMode {user} {password}')
+        return self.read()
+
+    def set_protocol(self, protocol):
+        """
+        Switch the sensor's host protocol between CoLa-A ('ascii') and CoLa-B ('binary').
+
+        Needs the access mode set first. The request and its reply use the current
+        protocol; everything after it is framed and decoded in the new one. In
+        binary mode scans come as uint16 distances (2 bytes per beam instead of 2 to
+        5 hex digits and a space), and decode_telegram reads them at fixed offsets.
+        Commands with arguments need a layout in telegram.BINARY_ARGUMENTS.
+        """
+        if protocol not in PROTOCOLS:
+            raise ValueError(f"Unknown protocol {protocol!r}, expected one of {', '.join(PROTOCOLS)}")
+        if protocol == self.protocol:
+            return None
+        if self.streaming():
+            raise RuntimeError("Stop streaming before switching protocols")
+        self.send(f"sWN EIHstCola {PROTOCOLS.index(protocol)}")
+        reply = self.read()
+        self.protocol = protocol
+        self.framer = TelegramFramer(READ_SIZE) if protocol == 'ascii' else BinaryFramer()
+        self._frames.clear()
+        return reply
+
+    
+    
+    def start_measurement(self):
+        self.send("sMN LMCstartmeas")
+        return self.read()
+
+    def run(self):
+        self.send('sMN Run')
+        return self.read()
+
+    def scan_data(self, data):
+        self.send(data)
+        return self.read()
+
+    def scan_data_raw(self, data):
+        self.send(data)
+        return self.read_raw()
+
+    def streaming(self):
+        return self._streaming.is_set()
+
+    def start_streaming(self, capacity=8):
+        """
+        Subscribe to continuous scan output and fill `self.ring` from a background thread.
+
+        While streaming, the reader thread owns the IN endpoint: use next_scan() or
+        latest_scan() to consume scans and stop_streaming() before sending other commands.
+        """
+        if self.streaming():
+            return None
+        self.ring = ScanRing(capacity)
+        reply = self.subscribe()
+        self._streaming.set()
+        self._reader = threading.Thread(target=self._read_loop, name="lidar-reader", daemon=True)
+        self._reader.start()
+        return reply
+
+    def stop_streaming(self):
+        if not self.streaming():
+            return
+        self._streaming.clear()
+        self._reader.join()
+        self._reader = None
+        self.unsubscribe()
+
+    def subscribe(self):
+        """Ask the sensor to push every scan; read them with read_telegrams()."""
+        self.send("sEN LMDscandata 1")
+        return self.read()
+
+    def unsubscribe(self):
+        self.send("sEN LMDscandata 0")
+        # Drain scans still in flight until the unsubscribe is acknowledged
+        for _ in range(1000):
+            reply = self.read_raw()
+            if reply is None or bytes(reply[:3]) == b"sEA":
+                break
+        self._frames.clear()
+
+    def read_telegrams(self):
+        """
+        One transfer from the sensor, framed into telegrams (bytes, without STX/ETX).
+
+        Timeouts give an empty list; other USB errors are counted in read_errors.
+        The time.monotonic() at which the transfer completed is kept in last_receive.
+        """
+        try:
+            n = self._transfer()
+        except usb.core.USBTimeoutError:
+            self.metrics.count('timeouts')
+            return []
+        except usb.core.USBError:
+            self.read_errors += 1
+            self.metrics.count('read_errors')
+            return []
+        self.last_receive = time.monotonic()
+        telegrams = self.framer.feed(self._view[:n])
+        self.metrics.record('framing', self.last_receive)
+        return telegrams
+
+    def next_scan(self, timeout=None):
+        """
+        Oldest buffered scan as (receive time, telegram bytes), blocking up to
+        `timeout` seconds; None on timeout. Receive times are time.monotonic().
+        """
+        return self.ring.get(timeout)
+
+    def latest_scan(self, timeout=None):
+        """Newest buffered (receive time, telegram bytes); older buffered scans are skipped."""
+        return self.ring.latest(timeout)
+
+    def _read_loop(self):
+        while self._streaming.is_set():
+            for telegram in self.read_telegrams():
+                if telegram.startswith(SCAN_PREFIX) and self.ring.put((self.last_receive, telegram)):
+                    self.metrics.count('dropped')
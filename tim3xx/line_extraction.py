@@ -0,0 +1,136 @@
+import math
+
+import numpy as np
+
+from .clustering import ClusterTable, cluster_runs
+from .coord_lib import GEOMETRY
+
+def _split(x, y, starts, ends, split_distance, min_points):
+    """
+    Recursive splitting, one level of the recursion per iteration for all pieces at once.
+    Pieces shorter than min_points are not split further.
+
+    Returns:
+        tuple: (starts, ends) of the final pieces, inclusive and sorted by start.
+    """
+    done_starts, done_ends = [], []
+    while len(starts):
+        n = ends - starts + 1
+        group = np.cumsum(n) - n
+        piece = np.repeat(np.arange(len(n)), n)
+        local = np.arange(len(piece)) - group[piece]
+        index = local + starts[piece]
+
+        # Distance of every point of every piece to the line through its end points
+        x0, y0 = x[starts], y[starts]
+        dx, dy = x[ends] - x0, y[ends] - y0
+        norm = np.hypot(dx, dy)
+        norm[norm == 0] = 1.0  # Coincident ends: no direction, never split
+        ux, uy = dx / norm, dy / norm
+        c = ux * y0 - uy * x0
+        d = np.abs(ux[piece] * y[index] - uy[piece] * x[index] - c[piece])
+
+        # Farthest point of each piece, the first one on ties
+        farthest = np.maximum.reduceat(d, group)
+        k = np.minimum.reduceat(np.where(d == farthest[piece], local, len(piece)), group)
+
+        split = (farthest > split_distance) & (n >= max(min_points, 3))
+        done_starts.append(starts[~split])
+        done_ends.append(ends[~split])
+        middle = starts[split] + k[split]
+        starts = np.concatenate((starts[split], middle))
+        ends = np.concatenate((middle, ends[split]))
+
+    starts = np.concatenate(done_starts)
+    ends = np.concatenate(done_ends)
+    order = np.argsort(starts, kind='stable')
+    return starts[order], ends[order]
+
+def _residual(moments, s, e):
+    """RMS distance of points s..e to their total least squares line, from prefix sums."""
+    n = e - s + 1
+    sx, sy, sxx, syy, sxy = (m[e + 1] - m[s] for m in moments)
+    mx, my = sx / n, sy / n
+    cxx, cyy, cxy = sxx / n - mx * mx, syy / n - my * my, sxy / n - mx * my
+    minor = (cxx + cyy) / 2 - math.sqrt(((cxx - cyy) / 2) ** 2 + cxy ** 2)
+    return math.sqrt(max(minor, 0.0))
+
+def split_and_merge(x, y, starts, lengths, split_distance=50.0, merge_residual=20.0, min_points=5):
+    """
+    Split every run of points into straight pieces, then merge collinear neighbours.
+
+    A run is split at the point farthest from the chord between its ends while that
+    distance exceeds split_distance; the split point ends one piece and starts the
+    next, so corners are shared. Neighbouring pieces are merged back while the RMS
+    residual of their joint line fit stays within merge_residual, which undoes
+    splits caused by a single noisy point.
+
+    Returns:
+        tuple: (starts, lengths) of the pieces with at least min_points points, in scan order.
+    """
+    starts = np.asarray(starts, dtype=np.intp)
+    if not len(starts):
+        return starts, np.zeros(0, dtype=np.intp)
+    starts, ends = _split(x, y, starts, starts + np.asarray(lengths) - 1,
+                         split_distance, min_points)
+
+    # Prefix sums of the moments (about the scan mean) give any joint fit in O(1)
+    cx, cy = x - x.mean(), y - y.mean()
+    moments = [np.concatenate(([0.0], np.cumsum(m))).tolist()
+               for m in (cx, cy, cx * cx, cy * cy, cx * cy)]
+
+    pieces = []
+    for s, e in zip(starts.tolist(), ends.tolist()):
+        if pieces and pieces[-1][1] == s and _residual(moments, pieces[-1][0], e) <= merge_residual:
+            pieces[-1][1] = e
+        else:
+            pieces.append([s, e])
+
+    pieces = np.array(pieces, dtype=np.intp)
+    lengths = pieces[:, 1] - pieces[:, 0] + 1
+    keep = lengths >= min_points
+    return pieces[keep, 0], lengths[keep]
+
+def extract_lines(x, y, ranges=None, split_distance=50.0, merge_residual=20.0, max_gap=100.0, range_ratio=0.05, min_points=5):
+    """
+    Line segments of an angle-ordered scan, straight from its Cartesian points.
+
+    The scan is first cut into clusters at range jumps (see cluster_ordered), each
+    cluster is split and merged into straight pieces, and every piece gets a total
+    least squares fit.
+
+    Parameters:
+        x, y (array-like): Cartesian points in scan order (mm).
+        ranges (array-like or None): Range of every point, needed when range_ratio > 0.
+        split_distance (float): Largest distance of a point to its segment (mm).
+        merge_residual (float): Largest RMS residual of two merged neighbours (mm).
+        max_gap (float): Fixed part of the gap that ends a cluster (mm).
+        range_ratio (float): Range-proportional part of that gap.
+        min_points (int): Smallest segment kept.
+
+    Returns:
+        ClusterTable: One entry per segment with endpoints (mm), residual (mm RMS),
+        angle and the point range starts[i] to starts[i] + lengths[i] - 1.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    starts, lengths = cluster_runs(x, y, ranges, max_gap, range_ratio, min_points)
+    starts, lengths = split_and_merge(x, y, starts, lengths, split_distance, merge_residual, min_points)
+    return ClusterTable(x, y, starts, lengths)
+
+def scan_lines(values, angles, min_range=1, **kwargs):
+    """
+    extract_lines on a scan as returned by parse_telegram / decode_telegram.
+
+    Beams below min_range (no return) are left out before clustering, so they
+    neither bridge nor cut segments. Point ranges refer to the kept beams, whose
+    scan indices are returned alongside.
+
+    Returns:
+        tuple: (ClusterTable, beam indices of the kept points)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    kept = np.flatnonzero(values >= min_range)
+    x, y = GEOMETRY.to_cartesian(values, angles)
+    x, y = x[kept], y[kept]
+    return extract_lines(x, y, values[kept], **kwargs), kept
@@ -0,0 +1,166 @@
+import array
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+import numpy as np
+
+class LatencyHistogram:
+    """
+    Rolling latency statistics of one stage.
+
+    The last `window` samples are kept in a preallocated ring, so recording is a
+    store and percentiles are only computed when a snapshot is taken. The count
+    and maximum cover every sample since the last reset.
+    """
+
+    def __init__(self, window=1024):
+        self.window = window
+        self._samples = array.array('d', bytes(8 * window))
+        self.count = 0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self._samples[self.count % self.window] = seconds
+        self.count += 1
+        if seconds > self.max:
+            self.max = seconds
+
+    def summary(self):
+        """count, p50, p99 and mean of the window, and the all-time max, in seconds."""
+        n = min(self.count, self.window)
+        if n == 0:
+            return {'count': 0, 'p50': 0.0, 'p99': 0.0, 'max': 0.0, 'mean': 0.0}
+        samples = np.frombuffer(self._samples, dtype=np.float64)[:n]
+        p50, p99 = np.percentile(samples, (50, 99))
+        return {'count': self.count, 'p50': float(p50), 'p99': float(p99), 'max': self.max,
+                'mean': float(samples.mean())}
+
+class _Timer:
+    __slots__ = ('metrics', 'stage', 'start')
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.monotonic()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.record(self.stage, self.start)
+
+_DISABLED = nullcontext()
+
+class Metrics:
+    """
+    Stage latencies and event counters of the acquisition and processing loops.
+
+    Stages are timed between time.monotonic() boundaries, the clock the driver
+    stamps received scans with, so end-to-end latencies can start at the receive
+    time of a scan. While disabled, clock() returns None and record(), add() and
+    count() return at once, so the instrumented paths cost a few attribute
+    lookups per stage.
+
+        start = METRICS.clock()
+        values, angles = decode_telegram(telegram)
+        METRICS.record('decode', start)
+
+        with METRICS.timed('render'):
+            ...
+
+    Parameters:
+        enabled (bool): Start recording immediately.
+        window (int): Samples per stage the percentiles are computed over.
+    """
+
+    def __init__(self, enabled=False, window=1024):
+        self.enabled = enabled
+        self.window = window
+        self.stages = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+        self._reporter = None
+        self._stop_reporting = threading.Event()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self.stages = {}
+            self.counters = {}
+
+    # Recording
+
+    def clock(self):
+        """Start time of a stage, or None while disabled."""
+        return time.monotonic() if self.enabled else None
+
+    def record(self, stage, start):
+        """Record the time since `start` (from clock() or a receive time) for stage."""
+        if start is None or not self.enabled:
+            return
+        self.add(stage, time.monotonic() - start)
+
+    def add(self, stage, seconds):
+        """Record a latency measured elsewhere; safe from several threads (e.g. one reader per Lidar)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self.stages.get(stage)
+            if histogram is None:
+                histogram = self.stages[stage] = LatencyHistogram(self.window)
+            histogram.add(seconds)
+
+    def count(self, name, n=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def timed(self, stage):
+        """Context manager timing its block as stage."""
+        return _Timer(self, stage) if self.enabled else _DISABLED
+
+    # Export
+
+    def snapshot(self):
+        """Latency summary of every stage (seconds) and the counters, as plain dicts."""
+        with self._lock:
+            stages = {name: self.stages[name].summary() for name in sorted(self.stages)}
+            counters = dict(self.counters)
+        return {'stages': stages, 'counters': counters}
+
+    def log_line(self):
+        """One line: p50/p99/max per stage in ms, then the counters."""
+        snapshot = self.snapshot()
+        parts = [f"{name} {s['p50'] * 1e3:.2f}/{s['p99'] * 1e3:.2f}/{s['max'] * 1e3:.2f}ms"
+                 for name, s in snapshot['stages'].items()]
+        parts += [f"{name}={value}" for name, value in sorted(snapshot['counters'].items())]
+        return "latency p50/p99/max: " + ", ".join(parts) if parts else "latency: no samples"
+
+    def report_every(self, interval, write=print):
+        """Call write(log_line()) every `interval` seconds from a daemon thread until stop_reporting()."""
+        self.stop_reporting()
+        self._stop_reporting.clear()
+
+        def loop():
+            while not self._stop_reporting.wait(interval):
+                write(self.log_line())
+
+        self._reporter = threading.Thread(target=loop, name="metrics-report", daemon=True)
+        self._reporter.start()
+
+    def stop_reporting(self):
+        if self._reporter is not None:
+            self._stop_reporting.set()
+            self._reporter.join()
+            self._reporter = None
+
+# Shared by the driver and the pipelines; LIDAR_METRICS=1 enables it at startup
+METRICS = Metrics(enabled=os.environ.get('LIDAR_METRICS', '') not in ('', '0'))
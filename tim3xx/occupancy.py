@@ -0,0 +1,164 @@
+import numpy as np
+
+from .coord_lib import GEOMETRY
+
+class OccupancyGrid:
+    """
+    Log-odds occupancy grid over a fixed-size window that follows the sensor.
+
+    Every scan marks the cells its beams pass through as free and the cells they
+    end in as occupied. The rays are sampled at one sample per cell for all beams
+    at once, and each cell is updated at most once per scan however many beams
+    cross it. Memory stays constant: the window is `shape` cells, it is shifted
+    (dropping what falls off the edge) when the sensor gets within `margin` of
+    its border, and `decay` pulls every cell back towards unknown on each update
+    so stale obstacles fade.
+
+    Coordinates are in mm in the world frame; the sensor pose is given per update.
+
+    Parameters:
+        shape (tuple): Rows and columns of the window.
+        resolution (float): Cell size in mm.
+        max_range (float): Beams are traced up to this range (mm).
+        hit, miss (float): Log-odds added to occupied and free cells.
+        limit (float): Log-odds are clamped to [-limit, limit].
+        decay (float): Factor applied to every cell per update, 1.0 to keep forever.
+        margin (float): Fraction of the window kept between the sensor and the border.
+    """
+
+    def __init__(self, shape=(400, 400), resolution=20.0, max_range=4000.0, hit=0.85, miss=-0.4,
+                 limit=5.0, decay=1.0, margin=0.25):
+        self.shape = shape
+        self.resolution = resolution
+        self.max_range = max_range
+        self.hit = hit
+        self.miss = miss
+        self.limit = limit
+        self.decay = decay
+        self.margin = margin
+        self.log_odds = np.zeros(shape, dtype=np.float32)
+        # World coordinates of the outer corner of cell (0, 0); rows grow with y
+        self.origin = np.array([-shape[1] * resolution / 2, -shape[0] * resolution / 2])
+        self.updates = 0
+        self._touched = np.zeros(shape[0] * shape[1], dtype=bool)
+        self._samples = (np.arange(int(np.ceil(max_range / resolution))) + 0.5) * resolution
+
+    # Window
+
+    def cell(self, x, y):
+        """Row and column of the cell holding world point (x, y)."""
+        return (int(np.floor((y - self.origin[1]) / self.resolution)),
+                int(np.floor((x - self.origin[0]) / self.resolution)))
+
+    def recenter(self, x, y):
+        """Shift the window by whole cells so (x, y) is at its center; cells shifted in are unknown."""
+        rows, cols = self.shape
+        row, col = self.cell(x, y)
+        dr, dc = row - rows // 2, col - cols // 2
+        if dr == 0 and dc == 0:
+            return
+        shifted = np.zeros_like(self.log_odds)
+        src_r = slice(max(dr, 0), rows + min(dr, 0))
+        dst_r = slice(max(-dr, 0), rows + min(-dr, 0))
+        src_c = slice(max(dc, 0), cols + min(dc, 0))
+        dst_c = slice(max(-dc, 0), cols + min(-dc, 0))
+        if src_r.start < src_r.stop and src_c.start < src_c.stop:
+            shifted[dst_r, dst_c] = self.log_odds[src_r, src_c]
+        self.log_odds = shifted
+        self.origin += (dc * self.resolution, dr * self.resolution)
+
+    def _follow(self, x, y):
+        rows, cols = self.shape
+        row, col = self.cell(x, y)
+        if not (self.margin * rows <= row < (1 - self.margin) * rows
+                and self.margin * cols <= col < (1 - self.margin) * cols):
+            self.recenter(x, y)
+
+    # Update
+
+    def update(self, values, angles, pose=(0.0, 0.0, 0.0)):
+        """
+        Integrate one scan.
+
+        Parameters:
+            values (array-like): Distances (mm); 0 means no return and the beam is skipped.
+            angles (array-like): Beam angles in the sensor frame (degrees).
+            pose (tuple): Sensor x, y (mm) and heading (degrees) in the world frame.
+        """
+        x, y, heading = pose
+        self._follow(x, y)
+        values = np.asarray(values, dtype=np.float64)
+        # Heading-0 table turned by the heading: continuous headings must not fill the shared cache
+        table = GEOMETRY.table(angles)
+        ch, sh = np.cos(np.radians(heading)), np.sin(np.radians(heading))
+        cos = table.cos * ch - table.sin * sh
+        sin = table.cos * sh + table.sin * ch
+        rows, cols = self.shape
+        res = self.resolution
+
+        # Free space: one sample per cell along every beam, short of its end cell
+        ox = (x - self.origin[0]) / res
+        oy = (y - self.origin[1]) / res
+        reach = np.where(values > 0, np.minimum(values, self.max_range) - res, 0.0)
+        steps = self._samples[:np.searchsorted(self._samples, reach.max(initial=0.0))]
+        beam, step = np.nonzero(steps[None, :] < reach[:, None])
+        t = steps[step] / res
+        col = np.floor(ox + cos[beam] * t).astype(np.intp)
+        row = np.floor(oy + sin[beam] * t).astype(np.intp)
+        inside = (row >= 0) & (row < rows) & (col >= 0) & (col < cols)
+        free = row[inside] * cols + col[inside]
+
+        # Occupied: the end cell of every beam that returned within range
+        ended = (values > 0) & (values <= self.max_range)
+        col = np.floor(ox + cos[ended] * values[ended] / res).astype(np.intp)
+        row = np.floor(oy + sin[ended] * values[ended] / res).astype(np.intp)
+        inside = (row >= 0) & (row < rows) & (col >= 0) & (col < cols)
+        hits = row[inside] * cols + col[inside]
+
+        # Each cell once per scan: mark, collect, clear; a hit wins over a pass
+        touched = self._touched
+        touched[free] = True
+        touched[hits] = False
+        free = np.flatnonzero(touched)
+        touched[free] = False
+        touched[hits] = True
+        hits = np.flatnonzero(touched)
+        touched[hits] = False
+
+        grid = self.log_odds.reshape(-1)
+        if self.decay != 1.0:
+            grid *= self.decay
+        grid[free] += self.miss
+        grid[hits] += self.hit
+        grid[free] = np.maximum(grid[free], -self.limit)
+        grid[hits] = np.minimum(grid[hits], self.limit)
+        self.updates += 1
+
+    # Queries
+
+    def probability(self):
+        """Occupancy probability of every cell (0.5 where unknown)."""
+        return 1.0 / (1.0 + np.exp(-self.log_odds))
+
+    def region(self, xmin, ymin, xmax, ymax):
+        """View of the log-odds of the cells overlapping a world rectangle, clipped to the window."""
+        r0, c0 = self.cell(xmin, ymin)
+        r1, c1 = self.cell(xmax, ymax)
+        rows, cols = self.shape
+        return self.log_odds[max(r0, 0):min(r1 + 1, rows), max(c0, 0):min(c1 + 1, cols)]
+
+    def occupied(self, xmin, ymin, xmax, ymax, probability=0.65):
+        """True when any cell overlapping the rectangle is occupied with at least `probability`."""
+        region = self.region(xmin, ymin, xmax, ymax)
+        return bool(region.size) and bool(region.max() >= np.log(probability / (1 - probability)))
+
+    def free(self, xmin, ymin, xmax, ymax, probability=0.35, coverage=0.95):
+        """
+        True when no cell overlapping the rectangle leans occupied and at least `coverage`
+        of them are known free (at most `probability`). Far from the sensor some cells
+        fall between neighbouring beams and stay unknown, hence the coverage fraction.
+        """
+        region = self.region(xmin, ymin, xmax, ymax)
+        if not region.size or region.max() > 0:
+            return False
+        return bool(np.mean(region <= np.log(probability / (1 - probability))) >= coverage)
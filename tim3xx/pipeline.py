@@ -0,0 +1,111 @@
+import threading
+from collections import namedtuple
+
+from .stream import ScanRing
+from .telegram import decode_telegram
+
+Frame = namedtuple('Frame', ['timestamp', 'values', 'angles', 'decision'])
+
+class Pipeline:
+    """
+    Acquisition, detection and visualization decoupled by bounded queues.
+
+    The Lidar reader thread streams telegrams into its ring; a detection thread
+    decodes and runs `detect(values, angles)` on every scan in order; the
+    resulting frames go to a one-slot view ring, so a slow or absent display only
+    ever sees the newest frame and never holds back acquisition or detection.
+
+    Parameters:
+        lidar (Lidar): Connected driver; streaming is started and stopped here.
+        detect (callable): Called as detect(values, angles) on the detection thread.
+            Its return value is published as Frame.decision; an exception it
+            raises is counted in detect_errors and the scan is skipped.
+        capacity (int): Scans buffered between acquisition and detection.
+        metrics (Metrics or None): Receives the queue, decode, detect and
+            scan_to_decision latencies, parse_errors and detect_errors; defaults
+            to the lidar's.
+    """
+
+    def __init__(self, lidar, detect, capacity=32, metrics=None):
+        self.lidar = lidar
+        self.metrics = metrics if metrics is not None else lidar.metrics
+        self.detect = detect
+        self.capacity = capacity
+        self.frames = ScanRing(1)
+        self.processed = 0
+        self.errors = 0
+        self.detect_errors = 0
+        self._running = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.lidar.start_streaming(self.capacity)
+        self._running.set()
+        self._thread = threading.Thread(target=self._detect_loop, name="lidar-detect", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if not self._running.is_set():
+            return
+        self._running.clear()
+        self._thread.join()
+        self.lidar.stop_streaming()
+
+    def latest(self, timeout=None):
+        """Newest detected Frame for display; frames never looked at are dropped."""
+        return self.frames.latest(timeout)
+
+    def _detect_loop(self):
+        while self._running.is_set():
+            scan = self.lidar.next_scan(timeout=0.1)
+            if scan is None:
+                continue
+            timestamp, telegram = scan
+            metrics = self.metrics
+            start = metrics.clock()
+            metrics.record('queue', timestamp)
+            try:
+                values, angles = decode_telegram(telegram)
+            except ValueError as e:
+                self.errors += 1
+                metrics.count('parse_errors')
+                print(f"Error processing scan: {e}")
+                continue
+            metrics.record('decode', start)
+            start = metrics.clock()
+            try:
+                decision = self.detect(values, angles)
+            except Exception as e:
+                # A failing detector must not end the thread: skip the scan, keep streaming
+                self.detect_errors += 1
+                metrics.count('detect_errors')
+                print(f"Error in detection: {e!r}")
+                continue
+            metrics.record('detect', start)
+            # Receive time to decision, both on the time.monotonic() clock
+            metrics.record('scan_to_decision', timestamp)
+            self.processed += 1
+            self.frames.put(Frame(timestamp, values, angles, decision))
+
+    def stats(self):
+        """Queue depth and drop counts of every stage."""
+        ring = self.lidar.ring
+        return {
+            'acquisition': {
+                'depth': len(ring) if ring is not None else 0,
+                'received': ring.received if ring is not None else 0,
+                'dropped': ring.dropped if ring is not None else 0,
+                'frames_dropped': self.lidar.framer.dropped,
+                'read_errors': self.lidar.read_errors,
+            },
+            'detection': {
+                'processed': self.processed,
+                'errors': self.errors,
+                'detect_errors': self.detect_errors,
+            },
+            'view': {
+                'depth': len(self.frames),
+                'dropped': self.frames.dropped,
+            },
+            'latency': self.metrics.snapshot()['stages'] if self.metrics.enabled else {},
+        }
@@ -0,0 +1,98 @@
+import numpy as np
+
+from .coord_lib import geometry_key
+
+class SectorLayout:
+    """Beam-to-sector assignment of one scan geometry, built once and reused per scan."""
+
+    def __init__(self, sector_angles, edges):
+        sector_count = len(edges) - 1
+        sector = np.searchsorted(edges, sector_angles, side='right') - 1
+        sector[sector_angles == edges[-1]] = sector_count - 1  # Last edge is inclusive
+        sector[(sector_angles < edges[0]) | (sector_angles > edges[-1])] = -1
+
+        # Beams grouped by sector so one reduceat gives every sector at once
+        inside = np.flatnonzero(sector >= 0)
+        self.order = inside[np.argsort(sector[inside], kind='stable')]
+        counts = np.bincount(sector[inside], minlength=sector_count)
+        self.nonempty = np.flatnonzero(counts)
+        self.starts = (np.cumsum(counts) - counts)[self.nonempty]
+        self.sector = sector
+        self.sector_count = sector_count
+
+class SectorEngine:
+    """
+    Per-sector minimum distance and occupancy of a scan.
+
+    Sectors are the angle intervals between consecutive `edges` (degrees, last edge
+    inclusive), after adding the mounting `offset` to every beam angle and, when
+    `wrap` is given, folding angles into [wrap, wrap + 360). The beam-to-sector
+    index is built once per scan geometry and cached, so each scan costs one gather
+    and one reduction.
+
+    Parameters:
+        edges (array-like): Increasing sector boundaries in degrees.
+        threshold (float): A sector is occupied when its closest return is below this (mm).
+        offset (float): Mounting rotation added to beam angles, in degrees.
+        wrap (float or None): Start of the 360 degree interval angles are folded into.
+        max_layouts (int): Number of cached geometries.
+    """
+
+    def __init__(self, edges=(-90, -45, 0, 45, 90), threshold=100, offset=0.0, wrap=None, max_layouts=8):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        if len(self.edges) < 2 or np.any(np.diff(self.edges) <= 0):
+            raise ValueError("Sector edges must be at least two increasing angles")
+        self.threshold = threshold
+        self.offset = offset
+        self.wrap = wrap
+        self.max_layouts = max_layouts
+        self._layouts = {}
+
+    @property
+    def sector_count(self):
+        return len(self.edges) - 1
+
+    def layout(self, angles):
+        """Cached SectorLayout for a beam angle vector, keyed by its geometry."""
+        angles = np.asarray(angles, dtype=np.float64)
+        key = geometry_key(angles)
+        layout = self._layouts.get(key)
+        if layout is None:
+            if len(self._layouts) >= self.max_layouts:
+                self._layouts.clear()
+            sector_angles = angles + self.offset
+            if self.wrap is not None:
+                sector_angles = (sector_angles - self.wrap) % 360 + self.wrap
+            layout = self._layouts[key] = SectorLayout(sector_angles, self.edges)
+        return layout
+
+    def evaluate(self, values, angles):
+        """
+        Parameters:
+            values (array-like): Distances of the scan (mm).
+            angles (array-like): Beam angles of the scan (degrees).
+
+        Returns:
+            tuple: (min_distance, occupied) per sector; min_distance is inf for sectors
+            without beams and occupied is 1 where min_distance < threshold.
+        """
+        layout = self.layout(angles)
+        values = np.asarray(values)
+        min_distance = np.full(layout.sector_count, np.inf)
+        if len(layout.order):
+            min_distance[layout.nonempty] = np.minimum.reduceat(values[layout.order], layout.starts)
+        occupied = (min_distance < self.threshold).astype(np.uint8)
+        return min_distance, occupied
+
+# Four 45 degree sections from -90 to 90 degrees
+SECTIONS = SectorEngine(edges=(-90, -45, 0, 45, 90), threshold=100)  # Threshold in mm
+
+def check_obstacles_in_sections(values, angles, engine=SECTIONS, hysteresis=None):
+    """
+    Divide the LiDAR data into four vertical sections and determine obstacle presence.
+    With a Hysteresis, its on/off distances replace the engine threshold.
+    """
+    min_distance, obstacle_status = engine.evaluate(values, angles)
+    if hysteresis is not None:
+        obstacle_status = hysteresis.update(min_distance)
+    return obstacle_status.tolist()
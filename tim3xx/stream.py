@@ -0,0 +1,57 @@
+import threading
+from collections import deque
+
+class ScanRing:
+    """
+    Bounded, thread-safe FIFO of scan telegrams.
+
+    The producer never blocks: when the ring is full the oldest telegram is
+    overwritten and counted in `dropped`. Consumers either block for the next
+    telegram in order (get) or jump to the newest one (latest), in which case the
+    skipped telegrams are counted in `skipped`.
+    """
+
+    def __init__(self, capacity=8):
+        if capacity < 1:
+            raise ValueError("Ring capacity must be at least 1")
+        self._items = deque(maxlen=capacity)
+        self._cond = threading.Condition()
+        self.capacity = capacity
+        self.received = 0
+        self.dropped = 0
+        self.skipped = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def put(self, item):
+        """Append item; True when the ring was full and the oldest item was dropped."""
+        with self._cond:
+            full = len(self._items) == self.capacity
+            if full:
+                self.dropped += 1
+            self._items.append(item)
+            self.received += 1
+            self._cond.notify()
+            return full
+
+    def get(self, timeout=None):
+        """Oldest telegram, waiting up to `timeout` seconds; None if nothing arrived."""
+        with self._cond:
+            if not self._items and not self._cond.wait_for(lambda: self._items, timeout):
+                return None
+            return self._items.popleft()
+
+    def latest(self, timeout=None):
+        """Newest telegram, discarding older ones; waits like get() when empty."""
+        with self._cond:
+            if not self._items and not self._cond.wait_for(lambda: self._items, timeout):
+                return None
+            item = self._items.pop()
+            self.skipped += len(self._items)
+            self._items.clear()
+            return item
+
+    def clear(self):
+        with self._cond:
+            self._items.clear()
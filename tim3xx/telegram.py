@@ -0,0 +1,516 @@
+import struct
+
+import numpy as np
+
+HEADER_TOKENS = 18
+SECTION_TOKENS = 8
+SCALE_FACTORS = {'3F800000': 1, '40000000': 2}
+# Polled replies (sRI E9 -> sRA E9) and streamed scans (sEN LMDscandata 1 -> sSN LMDscandata)
+SCAN_COMMAND_TYPES = (b'sRA', b'sSN')
+SCAN_COMMANDS = (b'E9', b'LMDscandata')
+
+# Hex digit value for every byte, 0xFF for anything that is not [0-9A-Fa-f]
+_HEX_LUT = np.full(256, 0xFF, dtype=np.uint8)
+_HEX_LUT[np.frombuffer(b'0123456789', dtype=np.uint8)] = np.arange(10)
+_HEX_LUT[np.frombuffer(b'ABCDEF', dtype=np.uint8)] = np.arange(10, 16)
+_HEX_LUT[np.frombuffer(b'abcdef', dtype=np.uint8)] = np.arange(10, 16)
+_DIGITS = np.arange(8)
+_DIGIT_WEIGHTS = 16 ** np.arange(8, dtype=np.uint32)
+
+# Header and section tokens of a scan telegram always fit in this many leading bytes
+_PREFIX_BYTES = 512
+
+# CoLa-B: four STX bytes, payload length (uint32, big-endian), payload, XOR of the payload
+COLA_B_STX = b'\x02\x02\x02\x02'
+# Largest CoLa-B payload a TiM3xx sends: 811 beams of distance and RSSI take under 4 KiB
+COLA_B_MAX_SIZE = 8192
+# Binary scan telegram after '<type> <command> ': the CoLa-A header tokens as fixed-width
+# fields, then the encoder and 16-bit channel counts
+_BINARY_HEADER = np.dtype([
+    ('version', '>u2'), ('device', '>u2'), ('serial', '>u4'), ('status', 'u1', 2),
+    ('telegram_counter', '>u2'), ('scan_counter', '>u2'),
+    ('time_since_startup', '>u4'), ('time_of_transmission', '>u4'),
+    ('inputs', 'u1', 2), ('outputs', 'u1', 2), ('reserved', '>u2'),
+    ('scan_frequency', '>u4'), ('measurement_frequency', '>u4'),
+    ('encoders', '>u2'), ('channels', '>u2'),
+])
+# One 16-bit channel block, followed by `count` big-endian uint16 values
+_BINARY_CHANNEL = np.dtype([
+    ('content', 'S5'), ('scale', '>f4'), ('offset', '>f4'),
+    ('start_angle', '>i4'), ('angle_step', '>u2'), ('count', '>u2'),
+])
+# Struct layout of the arguments of the commands the driver sends with parameters;
+# the ASCII arguments are hex numbers
+BINARY_ARGUMENTS = {
+    'sEN LMDscandata': '>B',
+    'sWN EIHstCola': '>B',
+    'sMN SetAccessMode': '>bI',
+}
+
+def _signed32(value):
+    """Two's complement reading of a 32-bit field (start angles may be negative)."""
+    return value - (1 << 32) if value >= 1 << 31 else value
+
+def parse_telegram(telegram):
+    tokens = telegram.split(' ')
+
+    # Ensure that there are enough tokens
+    if len(tokens) <= (18 + 8):  # Minimum valid length
+        raise ValueError("Insufficient data tokens")
+
+    # Extract header and validate
+    header = tokens[:18]
+    if header[0] != 'sRA':
+        raise ValueError("Invalid command type")
+    if header[1] != 'E9':
+        raise ValueError("Invalid command")
+
+    # Extract and validate data sections
+    sections = tokens[18:]
+    try:
+        if int(sections[0], 16) != 0:  # No encoder data
+            raise ValueError("Unexpected encoder data")
+        if int(sections[1], 16) != 1:  # Exactly 1 16-bit channel block
+            raise ValueError("Unexpected channel block count")
+        if sections[2] != 'DIST1':  # Distance data expected
+            raise ValueError("Unexpected data type")
+        if sections[3] not in ['3F800000', '40000000']:  # Check scale factor
+            raise ValueError("Invalid scale factor")
+
+        scale_factor = 1 if sections[3] == '3F800000' else 2
+        if sections[4] != '00000000':
+            raise ValueError("Unexpected value in section 4")
+
+        start_angle = _signed32(int(sections[5], 16)) / 10000.0
+        angle_step  = int(sections[6], 16) / 10000.0
+        value_count = int(sections[7], 16)
+
+        # Extract distance values and compute angles
+        values = list(map(lambda x: int(x, 16) * scale_factor, sections[8:8 + value_count]))
+        angles = [start_angle + angle_step * n for n in range(value_count)]
+
+        return (values, angles)
+
+    except ValueError as e:
+        raise ValueError(f"Parsing error: {e}")
+
+def _as_byte_array(telegram):
+    """View a telegram (bytes, bytearray, memoryview, array or str) as uint8 without framing bytes."""
+    if isinstance(telegram, str):
+        telegram = telegram.encode('latin-1')
+    buf = np.frombuffer(telegram, dtype=np.uint8)
+    if len(buf) and buf[0] == 0x02:  # STX
+        buf = buf[1:]
+    if len(buf) and buf[-1] == 0x03:  # ETX
+        buf = buf[:-1]
+    return buf
+
+def decode_telegram(telegram):
+    """
+    Decode an E9 or streamed LMDscandata scan telegram straight from the raw USB bytes.
+
+    Performs the same header and section validation as parse_telegram, but the
+    distance block is decoded in one vectorized pass through a hex-nibble lookup
+    table instead of one int() call per beam.
+
+    CoLa-B telegrams (see decode_binary_telegram) are recognised and decoded by
+    their fixed layout, so callers need not know which protocol the sensor speaks.
+
+    Parameters:
+        telegram (bytes-like or str): Telegram as read from the device, with or
+            without the STX/ETX framing bytes.
+
+    Returns:
+        tuple: (values, angles) where values is a uint32 array of distances in mm
+        and angles is a float64 array of beam angles in degrees.
+    """
+    if not isinstance(telegram, str) and is_binary_telegram(telegram):
+        return decode_binary_telegram(telegram)
+    buf = _as_byte_array(telegram)
+
+    # Only the header and section tokens are split as Python objects; they all fit
+    # in a short prefix of the telegram
+    prefix = buf[:_PREFIX_BYTES].tobytes().split(b' ', HEADER_TOKENS + SECTION_TOKENS)
+    if len(prefix) <= HEADER_TOKENS + SECTION_TOKENS and len(buf) > _PREFIX_BYTES:
+        prefix = buf.tobytes().split(b' ', HEADER_TOKENS + SECTION_TOKENS)
+
+    # Ensure that there are enough tokens
+    if len(prefix) <= HEADER_TOKENS + SECTION_TOKENS:
+        raise ValueError("Insufficient data tokens")
+
+    # Extract header and validate
+    header = prefix[:HEADER_TOKENS]
+    if header[0] not in SCAN_COMMAND_TYPES:
+        raise ValueError("Invalid command type")
+    if header[1] not in SCAN_COMMANDS:
+        raise ValueError("Invalid command")
+
+    # Extract and validate data sections
+    sections = [t.decode('latin-1') for t in prefix[HEADER_TOKENS:-1]]
+    try:
+        if int(sections[0], 16) != 0:  # No encoder data
+            raise ValueError("Unexpected encoder data")
+        if int(sections[1], 16) != 1:  # Exactly 1 16-bit channel block
+            raise ValueError("Unexpected channel block count")
+        if sections[2] != 'DIST1':  # Distance data expected
+            raise ValueError("Unexpected data type")
+        if sections[3] not in SCALE_FACTORS:  # Check scale factor
+            raise ValueError("Invalid scale factor")
+
+        scale_factor = SCALE_FACTORS[sections[3]]
+        if sections[4] != '00000000':
+            raise ValueError("Unexpected value in section 4")
+
+        start_angle = _signed32(int(sections[5], 16)) / 10000.0
+        angle_step  = int(sections[6], 16) / 10000.0
+        value_count = int(sections[7], 16)
+
+        angles = start_angle + angle_step * np.arange(value_count, dtype=np.float64)
+        if value_count == 0:
+            return (np.zeros(0, dtype=np.uint32), angles)
+
+        # Token boundaries of the distance block; the last value may end the buffer
+        block = buf[sum(map(len, prefix[:-1])) + HEADER_TOKENS + SECTION_TOKENS:]
+        ends = np.flatnonzero(block == 0x20)[:value_count]
+        if len(ends) < value_count:
+            if len(ends) < value_count - 1:
+                raise ValueError("Insufficient data tokens")
+            ends = np.append(ends, len(block))
+        starts = np.empty_like(ends)
+        starts[0] = 0
+        starts[1:] = ends[:-1] + 1
+        widths = ends - starts
+        width = int(widths.max())
+        if widths.min() < 1 or width > 8:
+            raise ValueError("Invalid distance token")
+
+        # Gather each token right-aligned into a (beams, width) nibble matrix through
+        # the lookup table and fold the columns into values
+        digit = _DIGITS[:width]
+        index = ends[:, None] - 1 - digit
+        present = digit < widths[:, None]
+        nibbles = _HEX_LUT[block[np.where(present, index, 0)]]
+        nibbles[~present] = 0
+        if (nibbles == 0xFF).any():
+            raise ValueError("Invalid distance token")
+        values = nibbles.astype(np.uint32) @ _DIGIT_WEIGHTS[:width]
+        values *= np.uint32(scale_factor)
+
+        return (values, angles)
+
+    except ValueError as e:
+        raise ValueError(f"Parsing error: {e}")
+
+def encode_telegram(values, start_angle=0.0, angle_step=1.0, scale_factor=1, streamed=False):
+    """
+    Build an ASCII scan telegram (without STX/ETX) for the given distances.
+
+    Parameters:
+        values (array-like): Distances in device units (before the scale factor).
+        start_angle (float): Angle of the first beam in degrees.
+        angle_step (float): Angular resolution in degrees.
+        scale_factor (int): 1 or 2, encoded as the DIST1 scale factor.
+        streamed (bool): Emit a pushed 'sSN LMDscandata' scan instead of an 'sRA E9' reply.
+
+    Returns:
+        str: Telegram that decode_telegram (and parse_telegram, for E9) accept.
+    """
+    scale_hex = {v: k for k, v in SCALE_FACTORS.items()}[scale_factor]
+    header = ['sSN', 'LMDscandata'] if streamed else ['sRA', 'E9']
+    header += ['1', '1', '89A27F', '0', '0', '0', '0', '0', '0',
+               '0', '0', '0', '0', '0', '5DC', '0']
+    sections = ['0', '1', 'DIST1', scale_hex, '00000000',
+                f"{int(round(start_angle * 10000)) & 0xFFFFFFFF:X}",
+                f"{int(round(angle_step * 10000)):X}",
+                f"{len(values):X}"]
+    data = [f"{int(v):X}" for v in values]
+    trailer = ['0', '0', '0', '0', '0']
+    return ' '.join(header + sections + data + trailer)
+
+def is_binary_telegram(telegram):
+    """
+    True for a CoLa-B telegram, framed or not. CoLa-A text never holds control
+    bytes, while the first binary field after the command (the version) starts with one.
+    """
+    head = bytes(memoryview(telegram)[:64])
+    if head.startswith(COLA_B_STX):
+        return True
+    parts = head.split(b' ', 2)
+    return len(parts) == 3 and parts[2][:1] != b'' and parts[2][0] < 0x20
+
+def _is_command_type(head):
+    """True for the 4 bytes a CoLa payload opens with: 's', two letters, a space."""
+    return head[0] == 0x73 and bytes(head[1:3]).isalpha() and head[3] == 0x20
+
+def binary_checksum(payload):
+    """CoLa-B checksum: XOR of all payload bytes."""
+    return int(np.bitwise_xor.reduce(np.frombuffer(payload, dtype=np.uint8), initial=0))
+
+def frame_binary(payload):
+    """Wrap a CoLa-B payload in STX, length and checksum."""
+    return COLA_B_STX + struct.pack('>I', len(payload)) + payload + bytes((binary_checksum(payload),))
+
+def unframe_binary(telegram):
+    """
+    Payload of a framed CoLa-B telegram, after checking its length and checksum.
+
+    Raises:
+        ValueError: When the frame is truncated or the checksum does not match.
+    """
+    telegram = bytes(telegram)
+    if not telegram.startswith(COLA_B_STX) or len(telegram) < 9:
+        raise ValueError("Not a CoLa-B frame")
+    length = struct.unpack_from('>I', telegram, 4)[0]
+    if len(telegram) < 9 + length:
+        raise ValueError("Truncated CoLa-B frame")
+    payload = telegram[8:8 + length]
+    if binary_checksum(payload) != telegram[8 + length]:
+        raise ValueError("CoLa-B checksum mismatch")
+    return payload
+
+def encode_binary_command(cmd):
+    """
+    CoLa-B payload of an ASCII command: the command name stays text and the hex
+    arguments are packed per BINARY_ARGUMENTS.
+
+    Raises:
+        ValueError: For a command with arguments but no known binary layout.
+    """
+    tokens = cmd.split(' ')
+    name = ' '.join(tokens[:2])
+    if len(tokens) <= 2:
+        return name.encode('ascii')
+    layout = BINARY_ARGUMENTS.get(name)
+    if layout is None:
+        raise ValueError(f"No CoLa-B layout for {name!r}; send it over CoLa-A")
+    values = [int(t, 16) for t in tokens[2:]]
+    return name.encode('ascii') + b' ' + struct.pack(layout, *values)
+
+def decode_binary_telegram(telegram):
+    """
+    Decode a binary (CoLa-B) E9 or LMDscandata scan telegram.
+
+    The header and channel block are read at fixed offsets as numpy structured
+    records and the distances as one big-endian uint16 array, so nothing is
+    converted to text. Validation and results are the same as decode_telegram
+    on the ASCII form of the scan.
+
+    Parameters:
+        telegram (bytes-like): Payload, or the whole frame with STX, length and checksum.
+
+    Returns:
+        tuple: (values, angles) as uint32 distances in mm and float64 angles in degrees.
+    """
+    if bytes(memoryview(telegram)[:4]) == COLA_B_STX:
+        telegram = unframe_binary(telegram)
+    buf = np.frombuffer(telegram, dtype=np.uint8)
+
+    parts = buf[:64].tobytes().split(b' ', 2)
+    if len(parts) < 3:
+        raise ValueError("Insufficient data tokens")
+    if parts[0] not in SCAN_COMMAND_TYPES:
+        raise ValueError("Invalid command type")
+    if parts[1] not in SCAN_COMMANDS:
+        raise ValueError("Invalid command")
+    offset = len(parts[0]) + len(parts[1]) + 2
+
+    try:
+        if len(buf) < offset + _BINARY_HEADER.itemsize + _BINARY_CHANNEL.itemsize:
+            raise ValueError("Insufficient data")
+        header = np.frombuffer(buf, _BINARY_HEADER, 1, offset)[0]
+        if header['encoders'] != 0:  # No encoder data
+            raise ValueError("Unexpected encoder data")
+        if header['channels'] != 1:  # Exactly 1 16-bit channel block
+            raise ValueError("Unexpected channel block count")
+        offset += _BINARY_HEADER.itemsize
+        channel = np.frombuffer(buf, _BINARY_CHANNEL, 1, offset)[0]
+        if channel['content'] != b'DIST1':  # Distance data expected
+            raise ValueError("Unexpected data type")
+        if channel['scale'] not in (1.0, 2.0):  # Check scale factor
+            raise ValueError("Invalid scale factor")
+        if channel['offset'] != 0.0:
+            raise ValueError("Unexpected value in section 4")
+
+        start_angle = int(channel['start_angle']) / 10000.0
+        angle_step  = int(channel['angle_step']) / 10000.0
+        value_count = int(channel['count'])
+        angles = start_angle + angle_step * np.arange(value_count, dtype=np.float64)
+
+        offset += _BINARY_CHANNEL.itemsize
+        if len(buf) < offset + 2 * value_count:
+            raise ValueError("Insufficient data")
+        values = np.frombuffer(buf, '>u2', value_count, offset).astype(np.uint32)
+        values *= np.uint32(channel['scale'])
+        return (values, angles)
+
+    except ValueError as e:
+        raise ValueError(f"Parsing error: {e}")
+
+def encode_binary_telegram(values, start_angle=0.0, angle_step=1.0, scale_factor=1, streamed=False):
+    """
+    Binary (CoLa-B) payload of the scan encode_telegram writes as text: same header
+    values, distances as big-endian uint16. Wrap it with frame_binary for the wire.
+    """
+    header = np.zeros(1, _BINARY_HEADER)
+    header['version'] = header['device'] = 1
+    header['serial'] = 0x89A27F
+    header['scan_frequency'] = 0x5DC
+    header['channels'] = 1
+    channel = np.zeros(1, _BINARY_CHANNEL)
+    channel['content'] = b'DIST1'
+    channel['scale'] = scale_factor
+    channel['start_angle'] = int(round(start_angle * 10000))
+    channel['angle_step'] = int(round(angle_step * 10000))
+    channel['count'] = len(values)
+    command = b'sSN LMDscandata ' if streamed else b'sRA E9 '
+    trailer = bytes(10)  # No 8-bit channels, position, name, comment or time
+    return (command + header.tobytes() + channel.tobytes()
+            + np.asarray(values, dtype='>u2').tobytes() + trailer)
+
+class TelegramFramer:
+    """
+    Incremental STX/ETX framer for CoLa-A telegrams.
+
+    Accepts USB transfers of any size, including ones that split a telegram or
+    carry several, and returns the complete telegrams (without STX/ETX) in order.
+    Every byte is searched once and consumed data is released from the front of
+    the buffer, so total work is linear in the bytes fed.
+
+    Counters:
+        frames: complete telegrams emitted.
+        dropped: telegrams cut short by a new STX or exceeding max_size.
+        garbled: runs of bytes found outside any STX...ETX frame.
+    """
+
+    def __init__(self, max_size=65535):
+        self.max_size = max_size
+        self._buf = bytearray()
+        self._in_frame = False
+        self._scan = 0  # Bytes of the open frame already searched for ETX
+        self.frames = 0
+        self.dropped = 0
+        self.garbled = 0
+
+    def idle(self):
+        """True when no partial telegram is buffered."""
+        return not self._buf
+
+    def count_frame(self):
+        """Count a complete telegram the caller took from a transfer without feeding it."""
+        self.frames += 1
+
+    def reset(self):
+        self._buf.clear()
+        self._in_frame = False
+        self._scan = 0
+
+    def feed(self, chunk):
+        buf = self._buf
+        buf += chunk
+        telegrams = []
+        while buf:
+            if not self._in_frame:
+                stx = buf.find(b'\x02')
+                if stx < 0:
+                    self.garbled += 1
+                    buf.clear()
+                    break
+                if stx > 0:
+                    self.garbled += 1
+                del buf[:stx]
+                self._in_frame = True
+                self._scan = 1
+
+            etx = buf.find(b'\x03', self._scan)
+            stx = buf.find(b'\x02', self._scan, etx if etx >= 0 else len(buf))
+            if stx >= 0:
+                # A new telegram starts before this one ended
+                self.dropped += 1
+                del buf[:stx]
+                self._scan = 1
+                continue
+            if etx < 0:
+                self._scan = len(buf)
+                if len(buf) > self.max_size:
+                    self.dropped += 1
+                    self.reset()
+                break
+
+            telegrams.append(bytes(buf[1:etx]))
+            self.frames += 1
+            del buf[:etx + 1]
+            self._in_frame = False
+            # Padding after ETX (the \0 some firmware appends) is not a garbled frame
+            while buf[:1] == b'\0':
+                del buf[:1]
+        return telegrams
+
+class BinaryFramer:
+    """
+    Incremental framer for CoLa-B telegrams, with the TelegramFramer interface.
+
+    Frames are found by their four STX bytes and cut by their length field. A
+    candidate is dropped, and the search resumes one byte after its start, when its
+    length exceeds max_size, when its payload does not open with a command type
+    ('sRA ', 'sSN ', ...) or when its checksum does not match; the first two are
+    checked as soon as 12 bytes are in, so a false or corrupted header never holds
+    back the telegrams behind it for longer than one transfer.
+
+    Counters:
+        frames: complete telegrams emitted (payload only).
+        dropped: candidates with a bad checksum, length or command type.
+        garbled: runs of bytes found outside any frame.
+    """
+
+    def __init__(self, max_size=COLA_B_MAX_SIZE):
+        self.max_size = max_size
+        self._buf = bytearray()
+        self.frames = 0
+        self.dropped = 0
+        self.garbled = 0
+
+    def idle(self):
+        """True when no partial telegram is buffered."""
+        return not self._buf
+
+    def count_frame(self):
+        """Count a complete telegram the caller took from a transfer without feeding it."""
+        self.frames += 1
+
+    def reset(self):
+        self._buf.clear()
+
+    def feed(self, chunk):
+        buf = self._buf
+        buf += chunk
+        telegrams = []
+        while buf:
+            stx = buf.find(COLA_B_STX)
+            if stx < 0:
+                # Keep a possible partial STX at the end
+                keep = len(buf) - len(buf.rstrip(b'\x02'))
+                if len(buf) > keep:
+                    self.garbled += 1
+                del buf[:len(buf) - keep]
+                break
+            if stx > 0:
+                self.garbled += 1
+                del buf[:stx]
+            if len(buf) < 8:
+                break
+            length = struct.unpack_from('>I', buf, 4)[0]
+            if length > self.max_size or (len(buf) >= 12 and not _is_command_type(buf[8:12])):
+                self.dropped += 1
+                del buf[:1]
+                continue
+            if len(buf) < max(12, 9 + length):
+                break
+            payload = bytes(buf[8:8 + length])
+            if binary_checksum(payload) != buf[8 + length]:
+                self.dropped += 1
+                del buf[:1]
+                continue
+            telegrams.append(payload)
+            self.frames += 1
+            del buf[:9 + length]
+        return telegrams
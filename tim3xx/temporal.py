@@ -0,0 +1,104 @@
+import numpy as np
+
+MODES = ('median', 'ema', 'min')
+
+class TemporalFilter:
+    """
+    Per-beam filter over the last `window` scans, kept in a preallocated (window, beams) ring.
+
+    Modes:
+        median: Median of every beam over the window; costs O(window) per beam.
+        ema: Exponential moving average with weight `alpha` on the newest scan; O(1).
+        min: Minimum over the window, the conservative choice for obstacles. Uses the
+            van Herk / Gil-Werman block scheme: a running minimum since the start of
+            the current block of `window` scans and suffix minima of the previous
+            block, recomputed once per block, so the cost per scan is O(1) amortized.
+
+    Until `window` scans have arrived, median and min cover the scans seen so far.
+    The geometry may not change while filtering; call reset() after changing it.
+
+    Parameters:
+        window (int): Number of scans filtered over.
+        mode (str): One of MODES.
+        alpha (float): EMA weight of the newest scan, in (0, 1].
+    """
+
+    def __init__(self, window=5, mode='median', alpha=0.5):
+        if mode not in MODES:
+            raise ValueError(f"Unknown filter mode {mode!r}, expected one of {', '.join(MODES)}")
+        if window < 1:
+            raise ValueError("Filter window must be at least 1")
+        self.window = window
+        self.mode = mode
+        self.alpha = alpha
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self._history = None
+
+    def _allocate(self, beams):
+        self._history = np.empty((self.window, beams))
+        self._out = np.empty(beams)
+        if self.mode == 'min':
+            self._prefix = np.empty(beams)
+            self._suffix = np.full((self.window + 1, beams), np.inf)  # Row window: empty suffix
+
+    def update(self, values):
+        """
+        Add a scan and return the filtered distances.
+
+        The result is a buffer reused by the next update; copy it to keep it.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if self._history is None:
+            self._allocate(len(values))
+        elif len(values) != self._history.shape[1]:
+            raise ValueError(f"Scan has {len(values)} beams, filter expects {self._history.shape[1]}")
+        k = self.count % self.window
+        self._history[k] = values
+        self.count += 1
+
+        if self.mode == 'ema':
+            if self.count == 1:
+                self._out[:] = values
+            else:
+                self._out *= 1 - self.alpha
+                self._out += self.alpha * values
+        elif self.mode == 'median':
+            np.median(self._history[:min(self.count, self.window)], axis=0, out=self._out)
+        else:
+            if k == 0:
+                self._prefix[:] = values
+            else:
+                np.minimum(self._prefix, values, out=self._prefix)
+            # Window = rows 0..k of this block and rows k+1.. of the previous one
+            np.minimum(self._prefix, self._suffix[k + 1], out=self._out)
+            if k == self.window - 1:
+                # Block complete: its suffix minima serve the whole next block
+                np.minimum.accumulate(self._history[::-1], axis=0, out=self._suffix[-2::-1])
+        return self._out
+
+class Hysteresis:
+    """
+    Occupancy with separate switch-on and switch-off distances.
+
+    An element becomes occupied when its distance drops below `on` and only clears
+    again once it rises above `off` (off >= on), so noise around a single
+    threshold no longer makes the output flicker. Works on any fixed-length array:
+    beams, sectors or ROI bands.
+    """
+
+    def __init__(self, on=100, off=120):
+        if off < on:
+            raise ValueError("Switch-off distance must not be below the switch-on distance")
+        self.on = on
+        self.off = off
+        self.state = None
+
+    def update(self, distances):
+        distances = np.asarray(distances)
+        if self.state is None or len(self.state) != len(distances):
+            self.state = np.zeros(len(distances), dtype=bool)
+        self.state = np.where(self.state, distances < self.off, distances < self.on)
+        return self.state.astype(np.uint8)
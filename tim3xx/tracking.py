@@ -0,0 +1,199 @@
+import numpy as np
+
+from .coord_lib import segment_scan
+
+# 99% gate of a chi-square distribution with 2 degrees of freedom
+GATE_99 = 9.21
+
+def segment_detections(table, angles, min_points=2, min_range=1):
+    """
+    One detection per segment of a SegmentTable: centroid (mm) and extent (mm).
+
+    Segments with fewer than min_points beams, and segments of beams without a
+    return (range below min_range), are dropped.
+
+    Returns:
+        tuple: ((n, 2) centroids, (n,) extents)
+    """
+    if len(table) == 0:
+        return np.zeros((0, 2)), np.zeros(0)
+    cx, cy = table.centroids(angles)
+    extent = table.extents(angles)
+    keep = (table.lengths >= min_points) & (table.min_range() >= min_range)
+    return np.column_stack((cx[keep], cy[keep])), extent[keep]
+
+class Tracker:
+    """
+    Multi-object tracker with a constant-velocity Kalman filter per track.
+
+    All tracks live in stacked arrays (state (n, 4) as x, y, vx, vy and covariance
+    (n, 4, 4)), so prediction, gating and the update are batched numpy operations
+    over every track. Detections are assigned greedily by Mahalanobis distance
+    within the chi-square gate; unmatched detections start tracks and tracks
+    missing more than max_missed frames in a row are dropped. The number of tracks
+    is capped, so a frame costs O(tracks x detections) at most.
+
+    Parameters:
+        sector_edges (array-like): Increasing sector boundaries (degrees) for time_to_collision.
+        accel_noise (float): Standard deviation of the unmodelled acceleration (mm/s^2).
+        measurement_noise (float): Standard deviation of a detection's position (mm).
+        initial_speed (float): Standard deviation of the velocity of a new track (mm/s).
+        gate (float): Squared Mahalanobis distance beyond which a detection cannot match.
+        min_hits (int): Updates before a track counts as confirmed.
+        max_missed (int): Consecutive frames without a match before a track is dropped.
+        max_tracks (int): Tracks kept at most; further detections are not tracked.
+    """
+
+    def __init__(self, sector_edges=(-90, -45, 0, 45, 90), accel_noise=2000.0, measurement_noise=50.0,
+                 initial_speed=1000.0, gate=GATE_99, min_hits=3, max_missed=5, max_tracks=64):
+        self.sector_edges = np.asarray(sector_edges, dtype=np.float64)
+        self.accel_noise = accel_noise
+        self.measurement_noise = measurement_noise
+        self.initial_speed = initial_speed
+        self.gate = gate
+        self.min_hits = min_hits
+        self.max_missed = max_missed
+        self.max_tracks = max_tracks
+        self.state = np.zeros((0, 4))
+        self.covariance = np.zeros((0, 4, 4))
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.hits = np.zeros(0, dtype=np.int64)
+        self.missed = np.zeros(0, dtype=np.int64)
+        self.extent = np.zeros(0)
+        self.timestamp = None
+        self._next_id = 0
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def confirmed(self):
+        return self.hits >= self.min_hits
+
+    def predict(self, dt):
+        """Advance every track by dt seconds."""
+        if not len(self) or dt <= 0:
+            return
+        F = np.eye(4)
+        F[0, 2] = F[1, 3] = dt
+        # Piecewise constant white acceleration
+        q = self.accel_noise ** 2
+        Q = q * np.array([[dt ** 4 / 4, 0, dt ** 3 / 2, 0],
+                          [0, dt ** 4 / 4, 0, dt ** 3 / 2],
+                          [dt ** 3 / 2, 0, dt ** 2, 0],
+                          [0, dt ** 3 / 2, 0, dt ** 2]])
+        self.state = self.state @ F.T
+        self.covariance = F @ self.covariance @ F.T + Q
+
+    def _associate(self, detections):
+        """Greedy gated assignment; returns matched (track, detection) index arrays."""
+        if not len(self) or not len(detections):
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+        S = self.covariance[:, :2, :2] + np.eye(2) * self.measurement_noise ** 2
+        S_inv = np.linalg.inv(S)
+        residual = detections[None, :, :] - self.state[:, None, :2]  # (tracks, detections, 2)
+        cost = np.einsum('tdi,tij,tdj->td', residual, S_inv, residual)
+
+        tracks, dets = np.nonzero(cost < self.gate)
+        order = np.argsort(cost[tracks, dets], kind='stable')
+        used_t = np.zeros(len(self), dtype=bool)
+        used_d = np.zeros(len(detections), dtype=bool)
+        matched_t, matched_d = [], []
+        for t, d in zip(tracks[order].tolist(), dets[order].tolist()):
+            if not used_t[t] and not used_d[d]:
+                used_t[t] = used_d[d] = True
+                matched_t.append(t)
+                matched_d.append(d)
+        return np.array(matched_t, dtype=np.intp), np.array(matched_d, dtype=np.intp)
+
+    def update(self, detections, extents=None, timestamp=None, dt=1 / 15):
+        """
+        Run one frame: predict to this frame, associate, correct, start and drop tracks.
+
+        Parameters:
+            detections (array-like): (n, 2) detected positions (mm).
+            extents (array-like or None): Size of every detection (mm).
+            timestamp (float or None): Frame time in seconds; dt is derived from it
+                when given, otherwise the fixed `dt` is used.
+        """
+        detections = np.asarray(detections, dtype=np.float64).reshape(-1, 2)
+        extents = np.zeros(len(detections)) if extents is None else np.asarray(extents, dtype=np.float64)
+        if timestamp is not None:
+            dt = timestamp - self.timestamp if self.timestamp is not None else 0.0
+            self.timestamp = timestamp
+        self.predict(dt)
+
+        tracks, dets = self._associate(detections)
+        if len(tracks):
+            P = self.covariance[tracks]
+            S = P[:, :2, :2] + np.eye(2) * self.measurement_noise ** 2
+            K = P[:, :, :2] @ np.linalg.inv(S)  # (m, 4, 2)
+            innovation = detections[dets] - self.state[tracks, :2]
+            self.state[tracks] += np.einsum('mij,mj->mi', K, innovation)
+            self.covariance[tracks] = P - K @ P[:, :2, :]
+            self.extent[tracks] = extents[dets]
+
+        self.hits[tracks] += 1
+        missed = np.ones(len(self), dtype=bool)
+        missed[tracks] = False
+        self.missed[missed] += 1
+        self.missed[tracks] = 0
+        self._drop(self.missed <= self.max_missed)
+
+        new = np.ones(len(detections), dtype=bool)
+        new[dets] = False
+        self._start(detections[new][:self.max_tracks - len(self)], extents[new][:self.max_tracks - len(self)])
+
+    def _drop(self, keep):
+        self.state = self.state[keep]
+        self.covariance = self.covariance[keep]
+        self.ids = self.ids[keep]
+        self.hits = self.hits[keep]
+        self.missed = self.missed[keep]
+        self.extent = self.extent[keep]
+
+    def _start(self, positions, extents):
+        n = len(positions)
+        if n == 0:
+            return
+        state = np.zeros((n, 4))
+        state[:, :2] = positions
+        covariance = np.zeros((n, 4, 4))
+        covariance[:, [0, 1], [0, 1]] = self.measurement_noise ** 2
+        covariance[:, [2, 3], [2, 3]] = self.initial_speed ** 2
+        self.state = np.concatenate((self.state, state))
+        self.covariance = np.concatenate((self.covariance, covariance))
+        self.ids = np.concatenate((self.ids, np.arange(self._next_id, self._next_id + n)))
+        self._next_id += n
+        self.hits = np.concatenate((self.hits, np.ones(n, dtype=np.int64)))
+        self.missed = np.concatenate((self.missed, np.zeros(n, dtype=np.int64)))
+        self.extent = np.concatenate((self.extent, extents))
+
+    def step(self, values, angles, timestamp=None, max_diff=150):
+        """Segment a scan (see coord_lib.segment_scan) and run one frame on its segments."""
+        positions, extents = segment_detections(segment_scan(values, max_diff), angles)
+        self.update(positions, extents, timestamp)
+
+    def time_to_collision(self):
+        """
+        Seconds until the first confirmed track reaches the sensor, per sector.
+
+        A track's time is its range over its closing speed (the negative radial
+        velocity); receding tracks never collide. Sectors without an approaching
+        confirmed track report inf.
+        """
+        ttc = np.full(len(self.sector_edges) - 1, np.inf)
+        confirmed = self.confirmed
+        if not confirmed.any():
+            return ttc
+        x, y, vx, vy = self.state[confirmed].T
+        distance = np.hypot(x, y)
+        closing = -(x * vx + y * vy) / np.maximum(distance, 1e-9)
+        with np.errstate(divide='ignore'):
+            time = np.where(closing > 0, distance / closing, np.inf)
+        angle = np.degrees(np.arctan2(y, x))
+        sector = np.searchsorted(self.sector_edges, angle, side='right') - 1
+        sector[angle == self.sector_edges[-1]] = len(ttc) - 1  # Last edge is inclusive
+        inside = (sector >= 0) & (sector < len(ttc))
+        np.minimum.at(ttc, sector[inside], time[inside])
+        return ttc
@@ -0,0 +1,191 @@
+import json
+import os
+
+import numpy as np
+
+from .coord_lib import GEOMETRY, geometry_key
+from .metrics import METRICS
+
+ZONE_TYPES = ('protective', 'warning')
+
+class Zone:
+    """
+    A field in the sensor frame.
+
+    Parameters:
+        name (str): Identifier reported with the results.
+        polygon (array-like): (k, 2) vertices in mm, in order, not closed.
+        kind (str): 'protective' or 'warning'.
+        min_beams (int): Beams that must fall inside before the zone counts as intruded.
+    """
+
+    def __init__(self, name, polygon, kind='protective', min_beams=1):
+        if kind not in ZONE_TYPES:
+            raise ValueError(f"Unknown zone type {kind!r}, expected one of {', '.join(ZONE_TYPES)}")
+        self.name = name
+        self.polygon = np.asarray(polygon, dtype=np.float64).reshape(-1, 2)
+        if len(self.polygon) < 3:
+            raise ValueError(f"Zone {name!r} needs at least 3 vertices")
+        self.kind = kind
+        self.min_beams = min_beams
+
+    def contains_origin(self):
+        """Even-odd test of the sensor position against the polygon."""
+        p = self.polygon
+        q = np.roll(p, -1, axis=0)
+        crosses = (p[:, 1] > 0) != (q[:, 1] > 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x = p[:, 0] - p[:, 1] * (q[:, 0] - p[:, 0]) / (q[:, 1] - p[:, 1])
+        return bool(np.count_nonzero(crosses & (x > 0)) % 2)
+
+    def beam_intervals(self, cos, sin):
+        """
+        Range intervals of every beam inside the polygon.
+
+        Returns:
+            tuple: (lo, hi) of shape (beams, m); a range r is inside when lo <= r < hi
+            for some column. Unused columns hold (inf, inf).
+        """
+        p = self.polygon
+        e = np.roll(p, -1, axis=0) - p
+        dx, dy = cos[:, None], sin[:, None]
+        # An edge crosses the beam's line when its ends lie on different sides, with
+        # points on the line counted below it, so a ray through a vertex crosses once
+        side = dx * p[:, 1] - dy * p[:, 0]
+        crosses = (side > 0) != (np.roll(side, -1, axis=1) > 0)
+        denom = dx * e[:, 1] - dy * e[:, 0]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = (p[:, 0] * e[:, 1] - p[:, 1] * e[:, 0]) / denom
+        valid = crosses & (t > 0)
+        crossings = np.sort(np.where(valid, t, np.inf), axis=1)
+        inside = self.contains_origin()
+        if inside:
+            crossings = np.hstack((np.zeros((len(cos), 1)), crossings))
+        # Pair consecutive crossings into (enter, leave), padded to an even count
+        width = int(valid.sum(axis=1).max(initial=0)) + inside
+        width = max(width + width % 2, 2)
+        pad = width - crossings.shape[1]
+        if pad > 0:
+            crossings = np.hstack((crossings, np.full((len(cos), pad), np.inf)))
+        crossings = crossings[:, :width]
+        return crossings[:, 0::2], crossings[:, 1::2]
+
+class ZoneLayout:
+    """Per-beam range intervals of every zone for one scan geometry, stacked as (zones, beams, m)."""
+
+    def __init__(self, zones, cos, sin):
+        intervals = [zone.beam_intervals(cos, sin) for zone in zones]
+        m = max((lo.shape[1] for lo, _ in intervals), default=1)
+        self.lo = np.full((len(zones), len(cos), m), np.inf)
+        self.hi = np.full((len(zones), len(cos), m), np.inf)
+        for i, (lo, hi) in enumerate(intervals):
+            self.lo[i, :, :lo.shape[1]] = lo
+            self.hi[i, :, :hi.shape[1]] = hi
+
+class ZoneEngine:
+    """
+    Evaluates protective and warning fields defined as metric polygons.
+
+    For every scan geometry the range interval(s) of each beam inside each zone
+    are computed once and cached, so evaluating all zones against a scan is one
+    broadcast comparison of the distances with the interval tables.
+
+    Parameters:
+        zones (list): Zone objects.
+        rotation (float): Mounting rotation added to the beam angles, in degrees.
+        max_layouts (int): Number of cached geometries.
+    """
+
+    def __init__(self, zones=(), rotation=0.0, max_layouts=8):
+        self.rotation = rotation
+        self.max_layouts = max_layouts
+        self.path = None
+        self.reload_errors = 0
+        self._mtime = None
+        self.set_zones(zones)
+
+    def set_zones(self, zones):
+        self.zones = list(zones)
+        self.names = [zone.name for zone in self.zones]
+        self.protective = np.array([zone.kind == 'protective' for zone in self.zones], dtype=bool)
+        self.min_beams = np.array([zone.min_beams for zone in self.zones], dtype=np.int64)
+        self._layouts = {}
+
+    @classmethod
+    def from_file(cls, path, max_layouts=8):
+        engine = cls(max_layouts=max_layouts)
+        engine.path = path
+        engine.reload()
+        return engine
+
+    def reload(self):
+        """
+        Read the zones from `path`, a JSON file of the form
+            {"rotation": -15,
+             "zones": [{"name": "front", "type": "protective", "min_beams": 2,
+                        "polygon": [[0, -300], [800, -300], [800, 300], [0, 300]]}]}
+        A file that fails to parse leaves the current zones in place and raises.
+        """
+        mtime = os.path.getmtime(self.path)
+        with open(self.path) as f:
+            config = json.load(f)
+        zones = [Zone(z['name'], z['polygon'], z.get('type', 'protective'), z.get('min_beams', 1))
+                 for z in config.get('zones', [])]
+        self.rotation = float(config.get('rotation', 0.0))
+        self.set_zones(zones)
+        self._mtime = mtime
+
+    def poll(self):
+        """
+        Reload when the configuration file changed since it was read; True if it did.
+
+        A missing, half-written or invalid file keeps the last good zones. It is
+        reported once (printed, and counted in reload_errors and the
+        zone_reload_errors metric) and read again only when it changes.
+        """
+        if self.path is None:
+            return False
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            mtime = None  # Deleted or being replaced
+        if mtime == self._mtime:
+            return False
+        try:
+            self.reload()
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            self._mtime = mtime
+            self.reload_errors += 1
+            METRICS.count('zone_reload_errors')
+            print(f"Keeping the previous zones, cannot load {self.path}: {e!r}")
+            return False
+        return True
+
+    def layout(self, angles):
+        angles = np.asarray(angles, dtype=np.float64)
+        key = geometry_key(angles)
+        layout = self._layouts.get(key)
+        if layout is None:
+            if len(self._layouts) >= self.max_layouts:
+                self._layouts.clear()
+            table = GEOMETRY.table(angles, self.rotation)
+            layout = self._layouts[key] = ZoneLayout(self.zones, table.cos, table.sin)
+        return layout
+
+    def evaluate(self, values, angles):
+        """
+        Parameters:
+            values (array-like): Distances of the scan (mm); 0 (no return) is never inside.
+            angles (array-like): Beam angles of the scan (degrees).
+
+        Returns:
+            tuple: (intruded, beams) per zone, in configuration order: intruded is 1
+            where at least min_beams beams fall inside, beams counts them.
+        """
+        if not self.zones:
+            return np.zeros(0, dtype=np.uint8), np.zeros(0, dtype=np.int64)
+        layout = self.layout(angles)
+        r = np.asarray(values, dtype=np.float64)[None, :, None]
+        inside = ((layout.lo <= r) & (r < layout.hi)).any(axis=2) & (r[:, :, 0] > 0)
+        beams = inside.sum(axis=1)
+        return (beams >= self.min_beams).astype(np.uint8), beams
@@ -0,0 +1,6 @@
+"""Alias of tim3xx.zones, for the scripts run from the repository root."""
+import sys
+
+import tim3xx.zones
+
+sys.modules[__name__] = tim3xx.zones